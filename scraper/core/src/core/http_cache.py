@@ -0,0 +1,84 @@
+"""HTTP validators (ETag / Last-Modified) for conditional requests."""
+
+import json
+import os
+from collections.abc import Mapping
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+import requests
+
+from core.state import STATE_DIR_ENV
+
+
+def conditional_headers(entry: Mapping[str, Any] | None) -> dict[str, str]:
+    """Return If-None-Match / If-Modified-Since headers for a cached entry."""
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def validators(resp: requests.Response) -> dict[str, str | None]:
+    """Return the ETag and Last-Modified validators of a response."""
+    return {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+
+
+class ValidatorCache:
+    """Bounded key -> validators map, persisted under SYNC_STATE_DIR.
+
+    Entries are plain dicts holding `etag` and `last_modified` plus whatever
+    the caller needs to reuse on a 304 (e.g. a content hash). Without a state
+    directory the cache lives in memory only, which still covers scheduled
+    runs of a long-running service.
+    """
+
+    def __init__(self, path: Path | None, max_entries: int = 1000) -> None:
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._lock = Lock()
+        self._entries: dict[str, dict[str, Any]] = {}
+        if path is not None:
+            try:
+                self._entries = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._entries = {}
+
+    @classmethod
+    def from_env(cls, name: str, max_entries: int = 1000) -> "ValidatorCache":
+        """Return a cache stored as `<name>-http.json` in SYNC_STATE_DIR."""
+        directory = os.getenv(STATE_DIR_ENV, "").strip()
+        if not directory:
+            return cls(None, max_entries)
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        return cls(path / f"{name}-http.json", max_entries)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry) if entry is not None else None
+
+    def set(self, key: str, entry: Mapping[str, Any]) -> None:
+        """Store entry for key, evicting the oldest entries beyond the bound."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = dict(entry)
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    def save(self) -> None:
+        """Write the cache atomically if it is backed by a file."""
+        if self.path is None:
+            return
+        with self._lock:
+            document = json.dumps(self._entries)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        tmp_path.write_text(document, encoding="utf-8")
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,92 @@
+"""Prometheus metrics and lightweight tracing spans shared by scrapers."""
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, TypeVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+
+F = TypeVar("F", bound=Callable[..., Any])
+SpanHook = Callable[[str, float, BaseException | None], None]
+
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "scraper_upstream_request_duration_seconds",
+    "Latency of each HTTP attempt to an upstream API.",
+    ["upstream", "method", "status"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+OUTSCRAPER_POLL_WAIT_SECONDS = Histogram(
+    "scraper_outscraper_poll_wait_seconds",
+    "Time spent waiting for a queued Outscraper request to complete.",
+    buckets=(0, 5, 10, 20, 30, 60, 90, 120, 150),
+)
+SYNC_RUN_SECONDS = Histogram(
+    "scraper_sync_run_duration_seconds",
+    "Wall-clock duration of a full sync run.",
+    ["job", "status"],
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+SYNC_RUN_ITEMS = Histogram(
+    "scraper_sync_run_items",
+    "Number of items per sync run, by outcome.",
+    ["job", "outcome"],
+    buckets=(0, 1, 5, 10, 20, 50, 100, 250, 500, 1000),
+)
+SPAN_SECONDS = Histogram(
+    "scraper_span_duration_seconds",
+    "Duration of traced operations.",
+    ["span", "outcome"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+
+_SPAN_HOOKS: list[SpanHook] = []
+
+
+def add_span_hook(hook: SpanHook) -> None:
+    """Register a callback invoked as hook(name, seconds, error) per span."""
+    _SPAN_HOOKS.append(hook)
+
+
+def remove_span_hook(hook: SpanHook) -> None:
+    """Unregister a callback added with add_span_hook."""
+    _SPAN_HOOKS.remove(hook)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block, record it in SPAN_SECONDS and notify span hooks."""
+    start = time.perf_counter()
+    error: BaseException | None = None
+    try:
+        yield
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        SPAN_SECONDS.labels(
+            span=name, outcome="error" if error is not None else "success"
+        ).observe(elapsed)
+        for hook in _SPAN_HOOKS:
+            hook(name, elapsed, error)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorate a function so each call is recorded as a span."""
+
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Return the Prometheus exposition payload and its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -3,16 +3,22 @@
 import os
 import time
 
-import requests
+from core.metrics import OUTSCRAPER_POLL_WAIT_SECONDS, traced
+from core.resilience import get_upstream
 
 API_KEY = os.environ.get("OUTSCRAPER_API_KEY", "")
 PLACE_ID = os.environ.get("GOOGLE_PLACE_ID", "")
 BASE_URL = "https://api.app.outscraper.com"
+POLL_INTERVAL_SECONDS = float(os.environ.get("OUTSCRAPER_POLL_INTERVAL_SECONDS", "5"))
 
+UPSTREAM = get_upstream("outscraper", rate_per_second=1.0, burst=2)
 
+
+@traced("outscraper.fetch_place_data")
 def fetch_place_data(params: dict) -> list:
     """Call Outscraper API and return place data, with automatic polling."""
-    resp = requests.get(
+    resp = UPSTREAM.request(
+        "GET",
         f"{BASE_URL}/maps/reviews-v3",
         headers={"X-API-KEY": API_KEY},
         params=params,
@@ -29,9 +35,11 @@ def fetch_place_data(params: dict) -> list:
         raise RuntimeError(f"Unexpected response: {body}")
 
     print(f"Request queued ({request_id}), polling …")
+    poll_start = time.perf_counter()
     for attempt in range(30):
-        time.sleep(5)
-        poll = requests.get(
+        time.sleep(POLL_INTERVAL_SECONDS)
+        poll = UPSTREAM.request(
+            "GET",
             f"{BASE_URL}/requests/{request_id}",
             headers={"X-API-KEY": API_KEY},
             timeout=30,
@@ -39,7 +47,9 @@ def fetch_place_data(params: dict) -> list:
         poll.raise_for_status()
         poll_body = poll.json()
         if poll_body.get("status") == "Success" and poll_body.get("data"):
+            OUTSCRAPER_POLL_WAIT_SECONDS.observe(time.perf_counter() - poll_start)
             return poll_body["data"]
         print(f"  attempt {attempt + 1}/30: {poll_body.get('status', 'unknown')}")
 
+    OUTSCRAPER_POLL_WAIT_SECONDS.observe(time.perf_counter() - poll_start)
     raise TimeoutError("Request did not complete in time")
@@ -0,0 +1,324 @@
+"""Rate limiting, retries and circuit breaking for upstream HTTP calls."""
+
+import os
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Any
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from core.metrics import UPSTREAM_REQUEST_SECONDS
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# A write may have committed before a timeout or 5xx, so non-idempotent
+# requests are only replayed when the upstream certainly did not act on them.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+UNPROCESSED_STATUS_CODES = frozenset({429, 503})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the upstream circuit is open."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket that blocks callers until a token is free."""
+
+    def __init__(self, rate_per_second: float, capacity: int) -> None:
+        self.rate_per_second = rate_per_second
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take one token, sleeping as needed, and return seconds waited."""
+        if self.rate_per_second <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate_per_second
+            time.sleep(delay)
+            waited += delay
+
+    def available(self) -> float:
+        """Return the number of tokens currently available."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return round(self._tokens, 3)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+        self._lock = Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may proceed."""
+        with self._lock:
+            if self._state == "closed":
+                return
+            if self._state == "open":
+                if time.monotonic() - (self._opened_at or 0) < self.reset_timeout:
+                    raise CircuitOpenError("circuit open")
+                self._state = "half_open"
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                raise CircuitOpenError("circuit half-open, probe in flight")
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed call and open the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return breaker state for health reporting."""
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_seconds": self.reset_timeout,
+            }
+
+
+def _retry_after_seconds(resp: requests.Response) -> float | None:
+    """Parse a Retry-After header given as seconds or an HTTP date."""
+    raw = resp.headers.get("Retry-After")
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(raw)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _is_connect_error(exc: Exception) -> bool:
+    """Return whether the request failed before a connection was made."""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class Upstream:
+    """One upstream API with its own session, rate limit, retries and breaker."""
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_second: float,
+        burst: int,
+        max_retries: int,
+        backoff_seconds: float,
+        max_backoff_seconds: float,
+        failure_threshold: int,
+        reset_timeout: float,
+    ) -> None:
+        self.name = name
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max(0, max_retries)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.session = requests.Session()
+        self._stats_lock = Lock()
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "rejected": 0,
+            "throttled_seconds": 0.0,
+            "last_error": None,
+        }
+
+    def _bump(self, key: str, amount: float = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _backoff(self, attempt: int, resp: requests.Response | None) -> float:
+        retry_after = _retry_after_seconds(resp) if resp is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff_seconds)
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * 2**attempt)
+        return delay * random.uniform(0.5, 1.0)
+
+    def request(
+        self, method: str, url: str, idempotent: bool | None = None, **kwargs: Any
+    ) -> requests.Response:
+        """Send a request, retrying 429/5xx and network errors with backoff.
+
+        Requests that are not idempotent (POST, PUT, ... unless the caller
+        passes `idempotent=True`) are only retried on connect errors, 429 and
+        503, so a write that committed but timed out is never replayed.
+
+        Returns the final response (which may still carry an error status once
+        retries are exhausted) so callers keep their own status handling.
+        Raises CircuitOpenError without contacting the upstream when the
+        circuit is open.
+        """
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError as exc:
+            self._bump("rejected")
+            raise CircuitOpenError(f"{self.name}: {exc}") from None
+
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self._bump("throttled_seconds", self.bucket.acquire())
+            self._bump("requests")
+            resp: requests.Response | None = None
+            error: Exception | None = None
+            started = time.perf_counter()
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = exc
+            except Exception:
+                self.breaker.record_failure()
+                self._bump("failures")
+                raise
+            finally:
+                UPSTREAM_REQUEST_SECONDS.labels(
+                    upstream=self.name,
+                    method=method,
+                    status=str(resp.status_code) if resp is not None else "error",
+                ).observe(time.perf_counter() - started)
+
+            failed = error is not None or resp.status_code in RETRY_STATUS_CODES
+            if not failed:
+                self.breaker.record_success()
+                return resp
+
+            if idempotent:
+                retryable = True
+            elif error is not None:
+                retryable = _is_connect_error(error)
+            else:
+                retryable = resp.status_code in UNPROCESSED_STATUS_CODES
+            if not retryable or attempt >= self.max_retries:
+                self.breaker.record_failure()
+                self._bump("failures")
+                with self._stats_lock:
+                    self._stats["last_error"] = (
+                        str(error) if error else f"status={resp.status_code}"
+                    )
+                if error is not None:
+                    raise error
+                return resp
+
+            self._bump("retries")
+            time.sleep(self._backoff(attempt, resp))
+            attempt += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return limiter, breaker and counter state for health reporting."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["throttled_seconds"] = round(stats["throttled_seconds"], 3)
+        return {
+            "rate_limit": {
+                "rate_per_second": self.bucket.rate_per_second,
+                "burst": self.bucket.capacity,
+                "available_tokens": self.bucket.available(),
+            },
+            "circuit": self.breaker.snapshot(),
+            "max_retries": self.max_retries,
+            **stats,
+        }
+
+
+_UPSTREAMS: dict[str, Upstream] = {}
+_UPSTREAMS_LOCK = Lock()
+
+
+def _env_float(prefix: str, key: str, default: float) -> float:
+    return float(os.getenv(f"{prefix}_{key}", str(default)))
+
+
+def get_upstream(
+    name: str,
+    rate_per_second: float = 5.0,
+    burst: int = 5,
+    max_retries: int = 3,
+    backoff_seconds: float = 1.0,
+    max_backoff_seconds: float = 30.0,
+    failure_threshold: int = 5,
+    reset_timeout: float = 60.0,
+) -> Upstream:
+    """Return the shared Upstream for name, creating it on first use.
+
+    Defaults can be overridden per upstream via environment variables
+    prefixed with the upper-cased name, e.g. STRAPI_RATE_PER_SECOND,
+    OUTSCRAPER_MAX_RETRIES or STRAPI_BREAKER_RESET_SECONDS.
+    """
+    with _UPSTREAMS_LOCK:
+        upstream = _UPSTREAMS.get(name)
+        if upstream is None:
+            prefix = name.upper()
+            upstream = Upstream(
+                name,
+                rate_per_second=_env_float(prefix, "RATE_PER_SECOND", rate_per_second),
+                burst=int(_env_float(prefix, "BURST", burst)),
+                max_retries=int(_env_float(prefix, "MAX_RETRIES", max_retries)),
+                backoff_seconds=_env_float(prefix, "BACKOFF_SECONDS", backoff_seconds),
+                max_backoff_seconds=_env_float(
+                    prefix, "MAX_BACKOFF_SECONDS", max_backoff_seconds
+                ),
+                failure_threshold=int(
+                    _env_float(prefix, "BREAKER_THRESHOLD", failure_threshold)
+                ),
+                reset_timeout=_env_float(
+                    prefix, "BREAKER_RESET_SECONDS", reset_timeout
+                ),
+            )
+            _UPSTREAMS[name] = upstream
+        return upstream
+
+
+def snapshot() -> dict[str, dict[str, Any]]:
+    """Return the state of every registered upstream, keyed by name."""
+    with _UPSTREAMS_LOCK:
+        upstreams = list(_UPSTREAMS.values())
+    return {upstream.name: upstream.snapshot() for upstream in upstreams}
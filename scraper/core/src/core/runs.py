@@ -0,0 +1,93 @@
+"""Bounded run history with atomically published snapshots."""
+
+from collections import deque
+from collections.abc import Callable, Mapping
+from threading import Lock
+from types import MappingProxyType
+from typing import Any
+
+RunListener = Callable[["RunHistory"], None]
+
+
+class RunHistory:
+    """Ring buffer of the last N run results.
+
+    The scheduler thread publishes each finished run; readers only ever see
+    a complete, read-only snapshot because the latest run is swapped in with
+    a single reference assignment.
+    """
+
+    def __init__(self, initial: Mapping[str, Any], max_runs: int = 50) -> None:
+        self._runs: deque[Mapping[str, Any]] = deque(maxlen=max(1, max_runs))
+        self._lock = Lock()
+        self._latest: Mapping[str, Any] = MappingProxyType(dict(initial))
+        self._consecutive_failures = 0
+        self._total_runs = 0
+        self._listeners: list[RunListener] = []
+
+    @property
+    def latest(self) -> Mapping[str, Any]:
+        """Return the most recently published run."""
+        return self._latest
+
+    @property
+    def consecutive_failures(self) -> int:
+        """Return the number of failed runs since the last success."""
+        return self._consecutive_failures
+
+    @property
+    def total_runs(self) -> int:
+        """Return the number of runs published, including restored ones."""
+        return self._total_runs
+
+    def add_listener(self, listener: RunListener) -> None:
+        """Call listener(history) after every published run."""
+        self._listeners.append(listener)
+
+    def restore(
+        self, runs: list[Mapping[str, Any]], total_runs: int | None = None
+    ) -> None:
+        """Load persisted runs (oldest first) without notifying listeners.
+
+        `total_runs` is the persisted count of all runs, which can exceed the
+        number of runs kept; it defaults to the number of runs restored.
+        """
+        with self._lock:
+            self._total_runs = max(total_runs or 0, len(runs))
+            for run in runs:
+                snapshot = MappingProxyType(dict(run))
+                self._runs.append(snapshot)
+                if snapshot.get("success"):
+                    self._consecutive_failures = 0
+                else:
+                    self._consecutive_failures += 1
+                self._latest = snapshot
+
+    def publish(self, result: Mapping[str, Any]) -> None:
+        """Record a finished run and notify listeners."""
+        snapshot = MappingProxyType(dict(result))
+        with self._lock:
+            self._runs.append(snapshot)
+            self._total_runs += 1
+            if snapshot.get("success"):
+                self._consecutive_failures = 0
+            else:
+                self._consecutive_failures += 1
+            self._latest = snapshot
+        for listener in self._listeners:
+            listener(self)
+
+    def page(self, offset: int = 0, limit: int = 20) -> dict[str, Any]:
+        """Return runs newest first, sliced by offset and limit."""
+        with self._lock:
+            runs = list(self._runs)
+        runs.reverse()
+        offset = max(0, offset)
+        limit = max(0, limit)
+        return {
+            "total": len(runs),
+            "total_runs": self._total_runs,
+            "offset": offset,
+            "limit": limit,
+            "runs": [dict(run) for run in runs[offset : offset + limit]],
+        }
@@ -0,0 +1,207 @@
+"""Generate Strapi API structures and database indexes for content types."""
+
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class Index:
+    """Database index on a collection table.
+
+    Strapi's `unique` attribute flag is only checked with a lookup query on
+    create and adds no database index, so unique attributes need one here.
+    Columns are database column names, i.e. the snake_case attribute names
+    plus Strapi's own columns such as `updated_at` or `created_at`.
+    """
+
+    columns: tuple[str, ...]
+    unique: bool = False
+    name: str | None = None
+
+    def index_name(self, table: str) -> str:
+        suffix = "uniq" if self.unique else "idx"
+        return self.name or f"{table}_{'_'.join(self.columns)}_{suffix}"
+
+
+# TypeScript file templates
+CONTROLLER_TEMPLATE = """/**
+ * {singular} controller
+ */
+
+import {{ factories }} from '@strapi/strapi';
+
+export default factories.createCoreController('api::{singular}.{singular}');
+"""
+
+ROUTE_TEMPLATE = """/**
+ * {singular} router
+ */
+
+import {{ factories }} from '@strapi/strapi';
+
+export default factories.createCoreRouter('api::{singular}.{singular}');
+"""
+
+SERVICE_TEMPLATE = """/**
+ * {singular} service
+ */
+
+import {{ factories }} from '@strapi/strapi';
+
+export default factories.createCoreService('api::{singular}.{singular}');
+"""
+
+# Strapi runs database/migrations before its schema sync creates the tables
+# (and never again), so indexes are created from the bootstrap() lifecycle
+# instead, which runs after the sync on every start.
+INDEXES_TEMPLATE = """'use strict';
+
+/**
+ * Indexes for the {table} collection, generated by schema_codegen.
+ * Created by ./index.js from the bootstrap() lifecycle.
+ */
+
+module.exports = {{
+  table: '{table}',
+  statements: [
+{statements}
+  ],
+}};
+"""
+
+INDEX_RUNNER_TEMPLATE = """'use strict';
+
+/**
+ * Create the indexes declared by the other files in this directory,
+ * generated by schema_codegen. Call it from bootstrap() in src/index, which
+ * runs after Strapi's schema sync, so the tables exist on a fresh database:
+ *
+ *   async bootstrap({ strapi }) {
+ *     await require('./indexes').ensureIndexes(strapi);
+ *   },
+ *
+ * Every statement uses IF NOT EXISTS, so running it on each start is cheap.
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+async function ensureIndexes(strapi) {
+  const knex = strapi.db.connection;
+  const files = fs
+    .readdirSync(__dirname)
+    .filter((file) => file.endsWith('.js') && file !== 'index.js')
+    .sort();
+  for (const file of files) {
+    const { table, statements } = require(path.join(__dirname, file));
+    if (!(await knex.schema.hasTable(table))) {
+      strapi.log.warn(`Skipping indexes for missing table ${table}`);
+      continue;
+    }
+    for (const statement of statements) {
+      await knex.raw(statement);
+    }
+  }
+}
+
+module.exports = { ensureIndexes };
+"""
+
+
+def indexes_filename(table: str) -> str:
+    """Return a stable filename so regeneration overwrites the same file."""
+    return f"{table}.js"
+
+
+def index_statements(table: str, indexes: Sequence[Index]) -> list[str]:
+    """Return idempotent CREATE INDEX statements for the given indexes."""
+    statements = []
+    for index in indexes:
+        unique = "UNIQUE " if index.unique else ""
+        columns = ", ".join(index.columns)
+        statements.append(
+            f"CREATE {unique}INDEX IF NOT EXISTS "
+            f"{index.index_name(table)} ON {table} ({columns})"
+        )
+    return statements
+
+
+def render_indexes(table: str, indexes: Sequence[Index]) -> str:
+    """Render the index module for one collection table."""
+    statements = "\n".join(
+        f"    '{statement}'," for statement in index_statements(table, indexes)
+    )
+    return INDEXES_TEMPLATE.format(table=table, statements=statements)
+
+
+def create_api_structure(
+    base_path: Path,
+    name: str,
+    schema: dict,
+    indexes: Sequence[Index] = (),
+) -> None:
+    """Create complete Strapi API structure for a content type."""
+    singular = schema["info"]["singularName"]
+
+    api_path = base_path / name
+    controllers_path = api_path / "controllers"
+    routes_path = api_path / "routes"
+    services_path = api_path / "services"
+    content_types_path = api_path / "content-types" / singular
+
+    controllers_path.mkdir(parents=True, exist_ok=True)
+    routes_path.mkdir(parents=True, exist_ok=True)
+    services_path.mkdir(parents=True, exist_ok=True)
+    content_types_path.mkdir(parents=True, exist_ok=True)
+
+    (controllers_path / f"{singular}.ts").write_text(
+        CONTROLLER_TEMPLATE.format(singular=singular), encoding="utf-8"
+    )
+    (routes_path / f"{singular}.ts").write_text(
+        ROUTE_TEMPLATE.format(singular=singular), encoding="utf-8"
+    )
+    (services_path / f"{singular}.ts").write_text(
+        SERVICE_TEMPLATE.format(singular=singular), encoding="utf-8"
+    )
+    (content_types_path / "schema.json").write_text(
+        json.dumps(schema, indent=2), encoding="utf-8"
+    )
+
+    print(f"✓ Generated {name}/")
+
+    if indexes:
+        table = schema["collectionName"]
+        indexes_path = base_path / "indexes"
+        indexes_path.mkdir(parents=True, exist_ok=True)
+        (indexes_path / "index.js").write_text(INDEX_RUNNER_TEMPLATE, encoding="utf-8")
+        filename = indexes_filename(table)
+        (indexes_path / filename).write_text(
+            render_indexes(table, indexes), encoding="utf-8"
+        )
+        print(f"✓ Generated indexes/{filename}")
+
+
+def generate(
+    project_dir: Path,
+    apis: Sequence[tuple[str, dict, Sequence[Index]]],
+) -> None:
+    """Generate Strapi API structures into project_dir/generated_strapi_types."""
+    base_path = project_dir / "generated_strapi_types"
+    base_path.mkdir(exist_ok=True)
+
+    print("Generating Strapi API structure …\n")
+    for name, schema, indexes in apis:
+        create_api_structure(base_path, name, schema, indexes)
+
+    print("\nTo use in Strapi:")
+    for name, _schema, _indexes in apis:
+        print(f"  cp -r generated_strapi_types/{name}/* <strapi>/src/api/{name}/")
+    if any(indexes for _name, _schema, indexes in apis):
+        print("  cp generated_strapi_types/indexes/* <strapi>/src/indexes/")
+        print(
+            "  Call require('./indexes').ensureIndexes(strapi) from bootstrap() "
+            "in <strapi>/src/index (once)."
+        )
+    print("  Restart Strapi.")
@@ -0,0 +1,72 @@
+"""Persisted run state for sync services, shared safely between processes."""
+
+import fcntl
+import json
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+STATE_DIR_ENV = "SYNC_STATE_DIR"
+
+
+class StateStore:
+    """JSON state file plus a lock file for one sync service.
+
+    The state file holds the recent run history, the number of runs so far
+    and the start of the last successful run. Writes go through a temporary
+    file and os.replace so readers never see a partial document. The lock
+    file serializes runs across processes or replicas sharing the directory.
+    """
+
+    def __init__(self, directory: Path, name: str, max_runs: int = 50) -> None:
+        self.path = directory / f"{name}.json"
+        self.lock_path = directory / f"{name}.lock"
+        self.max_runs = max(1, max_runs)
+
+    @classmethod
+    def from_env(cls, name: str, max_runs: int = 50) -> "StateStore | None":
+        """Return a store under SYNC_STATE_DIR, or None when it is not set."""
+        directory = os.getenv(STATE_DIR_ENV, "").strip()
+        if not directory:
+            return None
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        return cls(path, name, max_runs)
+
+    def load(self) -> dict[str, Any]:
+        """Return the persisted state, or an empty state if none exists."""
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"runs": []}
+
+    def _write(self, state: dict[str, Any]) -> None:
+        tmp_path = self.path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def record_run(self, result: dict[str, Any]) -> None:
+        """Append a finished run and update the run counter and last success."""
+        state = self.load()
+        runs = (state.get("runs") or []) + [result]
+        state["total_runs"] = state.get("total_runs", len(runs) - 1) + 1
+        state["runs"] = runs[-self.max_runs :]
+        if result.get("success"):
+            state["last_success_at"] = result.get("started_at")
+        self._write(state)
+
+    @contextmanager
+    def run_lock(self) -> Iterator[bool]:
+        """Try to take the cross-process run lock; yield whether it was taken."""
+        with open(self.lock_path, "a+") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
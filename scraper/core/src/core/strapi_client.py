@@ -5,6 +5,8 @@ import os
 
 import requests
 
+from core.resilience import get_upstream
+
 STRAPI_URL = os.environ.get("STRAPI_URL", "").rstrip("/")
 STRAPI_TOKEN = os.environ.get("STRAPI_TOKEN", "")
 PLACE_ID = os.environ.get("GOOGLE_PLACE_ID", "")
@@ -14,10 +16,13 @@ HEADERS = {
     "Content-Type": "application/json",
 }
 
+UPSTREAM = get_upstream("strapi", rate_per_second=10.0, burst=10)
+
 
 def post(collection: str, payload: dict) -> requests.Response:
     """POST data to a Strapi collection."""
-    return requests.post(
+    return UPSTREAM.request(
+        "POST",
         f"{STRAPI_URL}/api/{collection}",
         headers=HEADERS,
         json=payload,
@@ -25,9 +30,21 @@ def post(collection: str, payload: dict) -> requests.Response:
     )
 
 
+def put(collection: str, entry_id: str | int, payload: dict) -> requests.Response:
+    """PUT data to one entry of a Strapi collection."""
+    return UPSTREAM.request(
+        "PUT",
+        f"{STRAPI_URL}/api/{collection}/{entry_id}",
+        headers=HEADERS,
+        json=payload,
+        timeout=15,
+    )
+
+
 def get(collection: str, params: dict | None = None) -> requests.Response:
     """GET data from a Strapi collection."""
-    return requests.get(
+    return UPSTREAM.request(
+        "GET",
         f"{STRAPI_URL}/api/{collection}",
         headers=HEADERS,
         params=params or {},
@@ -35,6 +52,16 @@ def get(collection: str, params: dict | None = None) -> requests.Response:
     )
 
 
+def entry_id(entry: dict) -> str | int:
+    """Return the id used in entry URLs (documentId on Strapi 5, id on 4)."""
+    return entry.get("documentId") or entry["id"]
+
+
+def attributes(entry: dict) -> dict:
+    """Return entry fields for both Strapi 4 (nested) and 5 (flat) responses."""
+    return entry.get("attributes", entry)
+
+
 def parse_datetime(raw: str | int | float | None) -> str | None:
     """Convert datetime to ISO format."""
     if not raw:
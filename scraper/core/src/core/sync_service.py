@@ -0,0 +1,382 @@
+"""Scheduled sync services: cron, single-flight runs, history and probes.
+
+FastAPI and APScheduler are imported only when an app is built or a job is
+scheduled, and prometheus_client and requests (via core.metrics and
+core.resilience) only when a run is recorded or health is built, so module
+imports stay cheap.
+"""
+
+import json
+import logging
+import os
+import time
+from collections.abc import Callable, Mapping, Sequence
+from datetime import datetime, timezone
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+from core.runs import RunHistory
+from core.state import StateStore
+
+if TYPE_CHECKING:
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.cron import CronTrigger
+    from fastapi import APIRouter, FastAPI
+
+_PROBE_PATHS = ("/health", "/livez", "/readyz", "/metrics")
+_JSON = "application/json"
+_LIVEZ_BODY = b'{"status":"ok"}'
+
+RUN_HISTORY_SIZE = int(os.getenv("RUN_HISTORY_SIZE", "50"))
+READY_MAX_FAILURES = int(os.getenv("READY_MAX_CONSECUTIVE_FAILURES", "3"))
+HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+
+
+# Skip logging for probe and metrics endpoints
+class _SkipHealthCheckFilter(logging.Filter):
+    def filter(self, record):
+        message = record.getMessage()
+        return not any(path in message for path in _PROBE_PATHS)
+
+
+logging.getLogger("uvicorn.access").addFilter(_SkipHealthCheckFilter())
+
+
+class SyncService:
+    """One cron-scheduled sync job with run history and precomputed probes.
+
+    `sync` performs a run and returns its metadata dict, which must contain
+    `status`, `success` and `duration_seconds`; `count_fields` maps metric
+    outcome labels to integer fields of that dict.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sync: Callable[[], dict[str, Any]],
+        initial_run: Mapping[str, Any],
+        cron_env: str,
+        default_cron: str,
+        count_fields: Mapping[str, str] | None = None,
+    ) -> None:
+        self.name = name
+        self.sync = sync
+        self.cron_env = cron_env
+        self.default_cron = default_cron
+        self.count_fields = dict(count_fields or {})
+        self.runs = RunHistory(initial_run, max_runs=RUN_HISTORY_SIZE)
+        self.state = StateStore.from_env(name, max_runs=RUN_HISTORY_SIZE)
+        if self.state is not None:
+            persisted = self.state.load()
+            self.runs.restore(persisted.get("runs") or [], persisted.get("total_runs"))
+        self.runs.add_listener(lambda _history: self.publish_probes())
+        self._run_lock = Lock()
+        self._scheduler: "BackgroundScheduler | None" = None
+        # (status_code, body) for /readyz and (expires_at, body) for /health;
+        # each is replaced as a whole so request handlers never observe a
+        # partial update.
+        self._readyz: tuple[int, bytes] = (503, b'{"status":"starting"}')
+        self._health: tuple[float, bytes] = (0.0, b"")
+        self._logger = logging.getLogger(f"{__name__}.{name}")
+
+    @property
+    def job_id(self) -> str:
+        return f"{self.name}_sync"
+
+    @property
+    def cron_expression(self) -> str:
+        return os.getenv(self.cron_env, self.default_cron).strip()
+
+    def trigger(self) -> "CronTrigger":
+        """Return the cron trigger, failing fast on an invalid expression."""
+        from apscheduler.triggers.cron import CronTrigger
+
+        cron_expression = self.cron_expression
+        try:
+            return CronTrigger.from_crontab(cron_expression)
+        except ValueError as exc:
+            raise RuntimeError(
+                f"Invalid cron expression '{cron_expression}' from {self.cron_env}."
+            ) from exc
+
+    def _record_run_metrics(self, result: Mapping[str, Any]) -> None:
+        """Export duration and per-outcome item counts of one run."""
+        from core import metrics
+
+        metrics.SYNC_RUN_SECONDS.labels(
+            job=self.name, status=result["status"]
+        ).observe(result["duration_seconds"])
+        for outcome, field in self.count_fields.items():
+            metrics.SYNC_RUN_ITEMS.labels(job=self.name, outcome=outcome).observe(
+                result[field]
+            )
+
+    def next_run_at(self) -> str | None:
+        """Return the next scheduled fire time, if the cron job is scheduled."""
+        if self._scheduler is None:
+            return None
+        job = self._scheduler.get_job(self.job_id)
+        if job is None or job.next_run_time is None:
+            return None
+        return job.next_run_time.isoformat()
+
+    def catch_up_due(self) -> bool:
+        """Return whether a cron fire time was missed since the last success.
+
+        Without a state store every startup counts as due, matching the
+        behaviour of a service that keeps no state across restarts.
+        """
+        if self.state is None:
+            return True
+        last_success = self.state.load().get("last_success_at")
+        if not last_success:
+            return True
+        last = datetime.fromisoformat(last_success)
+        now = datetime.now(timezone.utc)
+        next_fire = self.trigger().get_next_fire_time(None, last)
+        return next_fire is None or next_fire <= now
+
+    def _run_locked(self, catch_up: bool) -> None:
+        if catch_up and not self.catch_up_due():
+            self._logger.info(
+                "Skipping %s catch-up sync; another process already ran it.",
+                self.name,
+            )
+            return
+
+        result = self.sync()
+        self._record_run_metrics(result)
+        if self.state is not None:
+            self.state.record_run(result)
+        self.runs.publish(result)
+
+    def run_job(self, catch_up: bool = False) -> None:
+        """Run one sync job if another run is not already in progress.
+
+        With a state store the run also holds a lock file, so processes
+        sharing SYNC_STATE_DIR never sync concurrently. A catch-up run
+        re-checks the persisted state once it holds the lock and is skipped
+        if another process completed the missed run in the meantime.
+        """
+        if not self._run_lock.acquire(blocking=False):
+            self._logger.warning(
+                "Skipping scheduled %s sync because a run is already in progress.",
+                self.name,
+            )
+            return
+
+        try:
+            if self.state is None:
+                self._run_locked(catch_up)
+                return
+            with self.state.run_lock() as acquired:
+                if not acquired:
+                    self._logger.warning(
+                        "Skipping %s sync because another process is running it.",
+                        self.name,
+                    )
+                    return
+                self._run_locked(catch_up)
+        finally:
+            self._run_lock.release()
+
+    def schedule(self, scheduler: "BackgroundScheduler") -> None:
+        """Add the cron job, plus a catch-up run if a fire time was missed."""
+        scheduler.add_job(
+            self.run_job,
+            trigger=self.trigger(),
+            id=self.job_id,
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            misfire_grace_time=300,
+        )
+        self._scheduler = scheduler
+        if self.catch_up_due():
+            scheduler.add_job(
+                self.run_job,
+                kwargs={"catch_up": True},
+                id=f"{self.name}_initial_sync",
+            )
+        else:
+            self._logger.info(
+                "Skipping %s startup sync; last successful run is still current.",
+                self.name,
+            )
+        self._logger.info(
+            "Scheduled %s sync configured with cron '%s'.",
+            self.name,
+            self.cron_expression,
+        )
+
+    def unschedule(self) -> None:
+        """Forget the scheduler after it has been shut down."""
+        self._scheduler = None
+        self.publish_probes()
+
+    def publish_probes(self) -> None:
+        """Precompute the readiness response and invalidate the health cache."""
+        failures = self.runs.consecutive_failures
+        if self._scheduler is None or not self._scheduler.running:
+            self._readyz = (503, b'{"status":"scheduler_stopped"}')
+        elif failures >= READY_MAX_FAILURES:
+            body = {"status": "failing", "consecutive_failures": failures}
+            self._readyz = (503, json.dumps(body).encode())
+        else:
+            body = {"status": "ok", "consecutive_failures": failures}
+            self._readyz = (200, json.dumps(body).encode())
+        self._health = (0.0, b"")
+
+    @property
+    def readiness(self) -> tuple[int, bytes]:
+        return self._readyz
+
+    def health_body(self) -> dict[str, Any]:
+        """Build the full health payload for this service."""
+        from core import resilience
+
+        latest = self.runs.latest
+        status = "ok"
+        if latest["status"] == "error":
+            status = "error"
+
+        return {
+            "status": status,
+            "scheduler": {
+                "cron": self.cron_expression,
+                "next_run_at": self.next_run_at(),
+                "persisted": self.state is not None,
+            },
+            "latest_run": dict(latest),
+            "total_runs": self.runs.total_runs,
+            "consecutive_failures": self.runs.consecutive_failures,
+            "upstreams": resilience.snapshot(),
+        }
+
+    def cached_health(self) -> bytes:
+        """Return the serialized health payload, rebuilt at most every few seconds."""
+        expires_at, body = self._health
+        now = time.monotonic()
+        if now >= expires_at or not body:
+            body = json.dumps(self.health_body()).encode()
+            self._health = (now + HEALTH_CACHE_SECONDS, body)
+        return body
+
+    def router(self) -> "APIRouter":
+        """Return the /health and /runs routes for this service."""
+        from fastapi import APIRouter, Query, Response
+
+        router = APIRouter()
+
+        @router.get("/health")
+        def health() -> Response:
+            """Return API status, latest sync metadata and upstream client state.
+
+            The body is cached for HEALTH_CACHE_SECONDS and invalidated
+            whenever a run is published, so frequent polling does not contend
+            with sync work.
+            """
+            return Response(content=self.cached_health(), media_type=_JSON)
+
+        @router.get("/runs")
+        def runs(
+            offset: int = Query(0, ge=0),
+            limit: int = Query(20, ge=1, le=500),
+        ) -> dict[str, Any]:
+            """Return recent sync runs, newest first."""
+            return self.runs.page(offset=offset, limit=limit)
+
+        return router
+
+    def run_once(self) -> None:
+        """CLI entrypoint body for one-shot sync runs."""
+        result = self.sync()
+        print(result)
+        if not result["success"]:
+            raise SystemExit(1)
+
+
+def create_app(title: str, services: Sequence[SyncService]) -> "FastAPI":
+    """Build a FastAPI app that schedules and exposes the given services.
+
+    All services share one background scheduler. With a single service its
+    /health and /runs routes are served at the root; every service is also
+    available under /<name>/health and /<name>/runs.
+    """
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from fastapi import FastAPI, Response
+
+    app = FastAPI(title=title, version="0.2.0")
+    state: dict[str, BackgroundScheduler | None] = {"scheduler": None}
+
+    @app.on_event("startup")
+    def start_scheduler() -> None:
+        """Start the cron scheduler and queue initial syncs in the background."""
+        scheduler = BackgroundScheduler()
+        for service in services:
+            service.schedule(scheduler)
+        scheduler.start()
+        state["scheduler"] = scheduler
+        for service in services:
+            service.publish_probes()
+
+    @app.on_event("shutdown")
+    def stop_scheduler() -> None:
+        """Shutdown the cron scheduler when the API stops."""
+        scheduler = state["scheduler"]
+        if scheduler is not None:
+            scheduler.shutdown(wait=False)
+            state["scheduler"] = None
+        for service in services:
+            service.unschedule()
+
+    @app.get("/livez")
+    def livez() -> Response:
+        """Report that the process is serving requests."""
+        return Response(content=_LIVEZ_BODY, media_type=_JSON)
+
+    @app.get("/readyz")
+    def readyz() -> Response:
+        """Report readiness: scheduler running and no service persistently failing."""
+        if len(services) == 1:
+            status_code, body = services[0].readiness
+            return Response(content=body, status_code=status_code, media_type=_JSON)
+
+        status_code = 200
+        parts = []
+        for service in services:
+            service_status, service_body = service.readiness
+            status_code = max(status_code, service_status)
+            parts.append(b'"' + service.name.encode() + b'":' + service_body)
+        body = b'{"services":{' + b",".join(parts) + b"}}"
+        return Response(content=body, status_code=status_code, media_type=_JSON)
+
+    @app.get("/metrics")
+    def prometheus_metrics() -> Response:
+        """Expose Prometheus metrics for upstream calls, spans and sync runs."""
+        from core import metrics
+
+        payload, content_type = metrics.render_latest()
+        return Response(content=payload, media_type=content_type)
+
+    for service in services:
+        app.include_router(service.router(), prefix=f"/{service.name}")
+    if len(services) == 1:
+        app.include_router(services[0].router())
+    else:
+
+        @app.get("/health")
+        def health() -> Response:
+            """Return the combined health of every service."""
+            parts = []
+            status = b'"ok"'
+            for service in services:
+                if service.runs.latest["status"] == "error":
+                    status = b'"error"'
+                parts.append(
+                    b'"' + service.name.encode() + b'":' + service.cached_health()
+                )
+            body = b'{"status":' + status + b',"services":{' + b",".join(parts) + b"}}"
+            return Response(content=body, media_type=_JSON)
+
+    return app
@@ -0,0 +1,102 @@
+"""Tests for the Prometheus exposition of spans and sync runs."""
+
+from datetime import datetime, timezone
+
+import pytest
+from core.metrics import traced
+from core.state import StateStore
+from core.sync_service import SyncService, create_app
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+JOB = "metrics_demo"
+
+
+@traced("metrics_demo.fetch")
+def _fetch(fail: bool) -> int:
+    if fail:
+        raise RuntimeError("upstream unavailable")
+    return 3
+
+
+def _sync(fail: bool) -> dict:
+    started = datetime.now(timezone.utc).isoformat()
+    try:
+        fetched = _fetch(fail)
+    except RuntimeError as exc:
+        return {
+            "status": "error",
+            "success": False,
+            "started_at": started,
+            "duration_seconds": 0.02,
+            "fetched": 0,
+            "error": str(exc),
+        }
+    return {
+        "status": "success",
+        "success": True,
+        "started_at": started,
+        "duration_seconds": 0.01,
+        "fetched": fetched,
+        "error": None,
+    }
+
+
+def _samples(text: str) -> dict[tuple[str, tuple], float]:
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+    }
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch) -> SyncService:
+    monkeypatch.setenv("SYNC_STATE_DIR", str(tmp_path))
+    monkeypatch.setenv("METRICS_DEMO_SYNC_CRON", "0 0 1 * *")
+    # A recent success, so startup queues no catch-up run.
+    StateStore(tmp_path, JOB).record_run(
+        {
+            "status": "success",
+            "success": True,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+    failures = iter([False, True])
+    return SyncService(
+        name=JOB,
+        sync=lambda: _sync(next(failures)),
+        initial_run={"status": "never_run", "success": None, "fetched": 0},
+        cron_env="METRICS_DEMO_SYNC_CRON",
+        default_cron="0 0 1 * *",
+        count_fields={"fetched": "fetched"},
+    )
+
+
+def test_metrics_expose_span_and_run_histograms(service):
+    with TestClient(create_app("Demo", [service])) as client:
+        service.run_job()
+        service.run_job()
+        resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    samples = _samples(resp.text)
+
+    def count(name: str, **labels: str) -> float:
+        return samples[(f"{name}_count", tuple(sorted(labels.items())))]
+
+    span = "scraper_span_duration_seconds"
+    assert count(span, span="metrics_demo.fetch", outcome="success") == 1
+    assert count(span, span="metrics_demo.fetch", outcome="error") == 1
+
+    runs = "scraper_sync_run_duration_seconds"
+    assert count(runs, job=JOB, status="success") == 1
+    assert count(runs, job=JOB, status="error") == 1
+    assert samples[(f"{runs}_sum", (("job", JOB), ("status", "error")))] == 0.02
+
+    items = "scraper_sync_run_items"
+    assert count(items, job=JOB, outcome="fetched") == 2
+    assert samples[(f"{items}_sum", (("job", JOB), ("outcome", "fetched")))] == 3
+    bucket = (f"{items}_bucket", (("job", JOB), ("le", "0.0"), ("outcome", "fetched")))
+    assert samples[bucket] == 1
@@ -0,0 +1,259 @@
+"""Unit tests for the rate limiter, circuit breaker and retry policy."""
+
+import socket
+
+import pytest
+import requests
+from core.resilience import CircuitBreaker, CircuitOpenError, TokenBucket, Upstream
+
+from core import resilience
+
+
+class FakeClock:
+    """Stands in for time.monotonic/time.sleep; sleeping advances the clock."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.slept: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(resilience.time, "sleep", fake.sleep)
+    return fake
+
+
+def _response(status: int, headers: dict | None = None) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    return resp
+
+
+def _upstream(**overrides) -> Upstream:
+    settings = {
+        "rate_per_second": 0,
+        "burst": 1,
+        "max_retries": 3,
+        "backoff_seconds": 0,
+        "max_backoff_seconds": 0,
+        "failure_threshold": 100,
+        "reset_timeout": 60,
+        **overrides,
+    }
+    return Upstream("test", **settings)
+
+
+def _script(upstream: Upstream, *outcomes) -> list[str]:
+    """Make the session return (or raise) outcomes in order; return call log."""
+    calls: list[str] = []
+    remaining = list(outcomes)
+
+    def request(method, url, **kwargs):
+        calls.append(method)
+        outcome = remaining.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return _response(outcome)
+
+    upstream.session.request = request
+    return calls
+
+
+# TokenBucket
+
+
+def test_token_bucket_allows_burst_then_paces(clock):
+    bucket = TokenBucket(rate_per_second=2, capacity=3)
+
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.available() == 0
+
+
+def test_token_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate_per_second=2, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+
+    clock.now += 1
+    assert bucket.available() == 2
+    clock.now += 10
+    assert bucket.available() == 3
+
+
+def test_token_bucket_zero_rate_is_unlimited(clock):
+    bucket = TokenBucket(rate_per_second=0, capacity=1)
+
+    assert [bucket.acquire() for _ in range(5)] == [0.0] * 5
+    assert clock.slept == []
+
+
+# CircuitBreaker
+
+
+def test_breaker_opens_at_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+    assert breaker.snapshot()["state"] == "closed"
+    breaker.record_failure()
+
+    assert breaker.snapshot()["state"] == "open"
+    with pytest.raises(CircuitOpenError, match="circuit open"):
+        breaker.before_call()
+
+
+def test_breaker_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.snapshot()["state"] == "closed"
+    assert breaker.snapshot()["consecutive_failures"] == 1
+
+
+def test_breaker_half_open_allows_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock.now += 30
+    breaker.before_call()
+    assert breaker.snapshot()["state"] == "half_open"
+    with pytest.raises(CircuitOpenError, match="probe in flight"):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.snapshot()["state"] == "closed"
+    breaker.before_call()
+
+
+def test_breaker_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.snapshot()["state"] == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 30
+    breaker.before_call()
+
+
+# Retry-After
+
+
+def test_retry_after_seconds():
+    def parse(value):
+        headers = {"Retry-After": value} if value is not None else {}
+        return resilience._retry_after_seconds(_response(429, headers))
+
+    assert parse("7") == 7
+    assert parse("-3") == 0
+    assert parse(None) is None
+    assert parse("soon") is None
+
+
+def test_retry_after_http_date():
+    past = _response(503, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    future = _response(503, {"Retry-After": "Fri, 01 Jan 2100 00:00:00 GMT"})
+
+    assert resilience._retry_after_seconds(past) == 0
+    assert resilience._retry_after_seconds(future) > 0
+
+
+def test_backoff_honours_retry_after_up_to_max():
+    upstream = _upstream(backoff_seconds=1, max_backoff_seconds=10)
+
+    assert upstream._backoff(0, _response(429, {"Retry-After": "4"})) == 4
+    assert upstream._backoff(0, _response(429, {"Retry-After": "60"})) == 10
+    assert 2 <= upstream._backoff(2, _response(500)) <= 4
+
+
+# Upstream retry policy
+
+
+def test_get_retries_server_errors_and_timeouts():
+    upstream = _upstream()
+    calls = _script(upstream, 500, requests.ReadTimeout("slow"), 200)
+
+    assert upstream.request("GET", "http://upstream.test").status_code == 200
+    assert calls == ["GET"] * 3
+    assert upstream.snapshot()["retries"] == 2
+
+
+@pytest.mark.parametrize("method", ["POST", "PUT"])
+def test_write_is_not_replayed_after_server_error(method):
+    upstream = _upstream()
+    calls = _script(upstream, 500, 201)
+
+    assert upstream.request(method, "http://upstream.test").status_code == 500
+    assert calls == [method]
+    assert upstream.snapshot()["failures"] == 1
+
+
+def test_write_is_not_replayed_after_read_timeout():
+    upstream = _upstream()
+    calls = _script(upstream, requests.ReadTimeout("slow"), 201)
+
+    with pytest.raises(requests.ReadTimeout):
+        upstream.request("POST", "http://upstream.test")
+    assert calls == ["POST"]
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_write_is_retried_when_not_processed(status):
+    upstream = _upstream()
+    calls = _script(upstream, status, 201)
+
+    assert upstream.request("POST", "http://upstream.test").status_code == 201
+    assert calls == ["POST", "POST"]
+
+
+def test_write_is_retried_after_connect_error():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    upstream = _upstream(max_retries=2)
+
+    with pytest.raises(requests.ConnectionError):
+        upstream.request("POST", f"http://127.0.0.1:{port}/", timeout=1)
+    assert upstream.snapshot()["requests"] == 3
+
+
+def test_idempotent_write_is_retried():
+    upstream = _upstream()
+    calls = _script(upstream, 502, requests.ReadTimeout("slow"), 200)
+
+    resp = upstream.request("PUT", "http://upstream.test", idempotent=True)
+
+    assert resp.status_code == 200
+    assert calls == ["PUT"] * 3
+
+
+def test_open_circuit_rejects_without_calling(clock):
+    upstream = _upstream(failure_threshold=1, max_retries=0)
+    calls = _script(upstream, 500)
+    upstream.request("GET", "http://upstream.test")
+
+    with pytest.raises(CircuitOpenError, match="test: circuit open"):
+        upstream.request("GET", "http://upstream.test")
+    assert calls == ["GET"]
+    assert upstream.snapshot()["rejected"] == 1
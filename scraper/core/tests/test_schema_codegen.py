@@ -0,0 +1,95 @@
+"""Tests for the generated Strapi index modules."""
+
+import json
+import shutil
+import sqlite3
+import subprocess
+from pathlib import Path
+
+import pytest
+from core.schema_codegen import Index, generate
+
+SCHEMA = {
+    "kind": "collectionType",
+    "collectionName": "widgets",
+    "info": {"singularName": "widget", "pluralName": "widgets"},
+    "attributes": {
+        "place_id": {"type": "string"},
+        "serial": {"type": "string", "unique": True},
+    },
+}
+INDEXES = (Index(("place_id", "updated_at")), Index(("serial",), unique=True))
+
+# Runs the generated ensureIndexes() with a knex stand-in that records the
+# SQL instead of executing it.
+BOOTSTRAP_SCRIPT = """
+const tables = JSON.parse(process.argv[2]);
+const statements = [];
+const strapi = {
+  db: {
+    connection: {
+      schema: { hasTable: async (table) => tables.includes(table) },
+      raw: async (sql) => statements.push(sql),
+    },
+  },
+  log: { warn: () => {} },
+};
+require(process.argv[1]).ensureIndexes(strapi).then(() => {
+  console.log(JSON.stringify(statements));
+});
+"""
+
+
+@pytest.fixture
+def indexes_dir(tmp_path) -> Path:
+    generate(tmp_path, [("widget", SCHEMA, INDEXES)])
+    return tmp_path / "generated_strapi_types" / "indexes"
+
+
+def _bootstrap(indexes_dir: Path, tables: list[str]) -> list[str]:
+    """Run the generated bootstrap hook and return the SQL it issued."""
+    proc = subprocess.run(
+        ["node", "-e", BOOTSTRAP_SCRIPT, str(indexes_dir), json.dumps(tables)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout)
+
+
+def _schema_sync(db: sqlite3.Connection) -> None:
+    """Create the table the way Strapi's schema sync does on a fresh database."""
+    db.execute(
+        "CREATE TABLE widgets (id INTEGER PRIMARY KEY, place_id TEXT, serial TEXT, "
+        "created_at TEXT, updated_at TEXT)"
+    )
+
+
+def test_generate_writes_index_modules_not_migrations(indexes_dir):
+    assert sorted(path.name for path in indexes_dir.iterdir()) == [
+        "index.js",
+        "widgets.js",
+    ]
+    assert not (indexes_dir.parent / "database").exists()
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_bootstrap_indexes_table_created_by_schema_sync(indexes_dir):
+    db = sqlite3.connect(":memory:")
+    _schema_sync(db)
+
+    # Strapi runs bootstrap() after the schema sync on every start.
+    for _start in range(2):
+        for statement in _bootstrap(indexes_dir, ["widgets"]):
+            db.execute(statement)
+
+    names = {row[1]: row[2] for row in db.execute("PRAGMA index_list(widgets)")}
+    assert names == {"widgets_place_id_updated_at_idx": 0, "widgets_serial_uniq": 1}
+    db.execute("INSERT INTO widgets (serial) VALUES ('a')")
+    with pytest.raises(sqlite3.IntegrityError):
+        db.execute("INSERT INTO widgets (serial) VALUES ('a')")
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_bootstrap_skips_missing_tables(indexes_dir):
+    assert _bootstrap(indexes_dir, []) == []
@@ -0,0 +1,96 @@
+"""Tests for persisted run state and the cross-process run lock."""
+
+from core.runs import RunHistory
+from core.state import StateStore
+
+INITIAL_RUN = {"status": "never_run", "success": None}
+
+
+def _run(index: int, success: bool = True) -> dict:
+    return {
+        "status": "success" if success else "error",
+        "success": success,
+        "started_at": f"2026-01-01T{index:02d}:00:00+00:00",
+        "index": index,
+    }
+
+
+def test_from_env_without_state_dir(monkeypatch):
+    monkeypatch.delenv("SYNC_STATE_DIR", raising=False)
+
+    assert StateStore.from_env("demo") is None
+
+
+def test_from_env_creates_state_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("SYNC_STATE_DIR", str(tmp_path / "state"))
+
+    store = StateStore.from_env("demo")
+
+    assert store.path == tmp_path / "state" / "demo.json"
+    assert store.load() == {"runs": []}
+
+
+def test_record_run_persists_history_counters_and_last_success(tmp_path):
+    store = StateStore(tmp_path, "demo", max_runs=2)
+
+    store.record_run(_run(1))
+    store.record_run(_run(2, success=False))
+    store.record_run(_run(3, success=False))
+
+    state = StateStore(tmp_path, "demo").load()
+    assert [run["index"] for run in state["runs"]] == [2, 3]
+    assert state["total_runs"] == 3
+    assert state["last_success_at"] == "2026-01-01T01:00:00+00:00"
+    assert not store.path.with_suffix(".json.tmp").exists()
+
+
+def test_record_run_counts_runs_of_state_without_total(tmp_path):
+    store = StateStore(tmp_path, "demo")
+    store._write({"runs": [_run(1), _run(2)]})
+
+    store.record_run(_run(3))
+
+    assert store.load()["total_runs"] == 3
+
+
+def test_load_ignores_corrupt_state(tmp_path):
+    store = StateStore(tmp_path, "demo")
+    store.path.write_text("{not json", encoding="utf-8")
+
+    assert store.load() == {"runs": []}
+
+
+def test_run_lock_is_exclusive_until_released(tmp_path):
+    first = StateStore(tmp_path, "demo")
+    second = StateStore(tmp_path, "demo")
+
+    with first.run_lock() as acquired:
+        assert acquired
+        with second.run_lock() as contended:
+            assert not contended
+    with second.run_lock() as acquired:
+        assert acquired
+
+
+def test_restore_keeps_total_and_failure_streak():
+    history = RunHistory(INITIAL_RUN, max_runs=2)
+
+    history.restore([_run(1), _run(2, success=False), _run(3, success=False)], 40)
+
+    assert history.total_runs == 40
+    assert history.consecutive_failures == 2
+    assert history.latest["index"] == 3
+    page = history.page()
+    assert page["total"] == 2
+    assert page["total_runs"] == 40
+    assert [run["index"] for run in page["runs"]] == [3, 2]
+
+
+def test_restore_then_publish_continues_counting():
+    history = RunHistory(INITIAL_RUN)
+    history.restore([_run(1), _run(2)])
+
+    history.publish(_run(3))
+
+    assert history.total_runs == 3
+    assert history.consecutive_failures == 0
@@ -0,0 +1,256 @@
+"""Tests for the shared sync service: probes, run history and run locking."""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from core.state import StateStore
+from core.sync_service import READY_MAX_FAILURES, SyncService, create_app
+from fastapi.testclient import TestClient
+
+INITIAL_RUN = {"status": "never_run", "success": None, "fetched": 0}
+
+
+def _result(success: bool = True, **extra) -> dict:
+    return {
+        "status": "success" if success else "error",
+        "success": success,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "duration_seconds": 0.01,
+        "fetched": 1,
+        **extra,
+    }
+
+
+class Sync:
+    """Callable sync that returns queued results and counts its calls."""
+
+    def __init__(self, *results: dict) -> None:
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self) -> dict:
+        self.calls += 1
+        return self.results.pop(0) if self.results else _result()
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("SYNC_STATE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _service(sync, name: str = "demo") -> SyncService:
+    return SyncService(
+        name=name,
+        sync=sync,
+        initial_run=INITIAL_RUN,
+        cron_env="DEMO_SYNC_CRON",
+        default_cron="0 * * * *",
+        count_fields={"fetched": "fetched"},
+    )
+
+
+def _current(state_dir, name: str = "demo") -> None:
+    """Persist a successful run from just now, so startup queues no catch-up."""
+    StateStore(state_dir, name).record_run(_result())
+
+
+def test_livez_and_readyz(state_dir):
+    _current(state_dir)
+    service = _service(Sync())
+
+    assert service.readiness[0] == 503
+    with TestClient(create_app("Demo", [service])) as client:
+        livez = client.get("/livez")
+        readyz = client.get("/readyz")
+
+    assert livez.status_code == 200
+    assert livez.json() == {"status": "ok"}
+    assert readyz.status_code == 200
+    assert readyz.json() == {"status": "ok", "consecutive_failures": 0}
+    # The scheduler is stopped on shutdown.
+    assert service.readiness[0] == 503
+
+
+def test_readyz_fails_after_consecutive_failures(state_dir):
+    _current(state_dir)
+    sync = Sync(*[_result(success=False) for _ in range(READY_MAX_FAILURES)])
+    service = _service(sync)
+
+    with TestClient(create_app("Demo", [service])) as client:
+        for _ in range(READY_MAX_FAILURES - 1):
+            service.run_job()
+        assert client.get("/readyz").status_code == 200
+        service.run_job()
+        readyz = client.get("/readyz")
+
+    assert readyz.status_code == 503
+    assert readyz.json() == {
+        "status": "failing",
+        "consecutive_failures": READY_MAX_FAILURES,
+    }
+
+
+def test_readyz_combines_services(state_dir):
+    _current(state_dir, "first")
+    _current(state_dir, "second")
+    failing = _service(
+        Sync(*[_result(success=False) for _ in range(READY_MAX_FAILURES)]), "second"
+    )
+    services = [_service(Sync(), "first"), failing]
+
+    with TestClient(create_app("Demo", services)) as client:
+        for _ in range(READY_MAX_FAILURES):
+            failing.run_job()
+        readyz = client.get("/readyz")
+        first_runs = client.get("/first/runs")
+
+    assert readyz.status_code == 503
+    body = readyz.json()["services"]
+    assert body["first"]["status"] == "ok"
+    assert body["second"]["status"] == "failing"
+    assert first_runs.json()["total"] == 1
+
+
+def test_runs_pages_newest_first(state_dir):
+    _current(state_dir)
+    service = _service(Sync(_result(fetched=2), _result(fetched=3)))
+
+    with TestClient(create_app("Demo", [service])) as client:
+        service.run_job()
+        service.run_job()
+        page = client.get("/runs", params={"limit": 2}).json()
+        rest = client.get("/runs", params={"offset": 2}).json()
+        invalid = client.get("/runs", params={"limit": 0})
+
+    assert page["total"] == 3
+    assert [run["fetched"] for run in page["runs"]] == [3, 2]
+    assert [run["fetched"] for run in rest["runs"]] == [1]
+    assert invalid.status_code == 422
+
+
+def test_run_job_skips_overlapping_run():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_sync() -> dict:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return _result()
+
+    service = _service(slow_sync)
+    worker = threading.Thread(target=service.run_job)
+    worker.start()
+    try:
+        assert started.wait(5)
+        service.run_job()
+    finally:
+        release.set()
+        worker.join(5)
+
+    assert len(calls) == 1
+    assert service.runs.total_runs == 1
+
+
+def test_run_job_skips_when_another_process_holds_the_lock(state_dir):
+    sync = Sync()
+    service = _service(sync)
+    other_process = StateStore(state_dir, "demo")
+
+    with other_process.run_lock() as acquired:
+        assert acquired
+        service.run_job()
+    assert sync.calls == 0
+    assert service.runs.total_runs == 0
+
+    service.run_job()
+    assert sync.calls == 1
+    assert other_process.load()["runs"][-1]["success"] is True
+
+
+def test_run_job_releases_the_lock_after_a_failing_sync(state_dir):
+    def broken_sync() -> dict:
+        raise RuntimeError("boom")
+
+    service = _service(broken_sync)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        service.run_job()
+    with StateStore(state_dir, "demo").run_lock() as acquired:
+        assert acquired
+    assert service._run_lock.acquire(blocking=False)
+
+
+def _last_success(state_dir, started_at: datetime) -> None:
+    StateStore(state_dir, "demo").record_run(
+        {**_result(), "started_at": started_at.isoformat()}
+    )
+
+
+def test_restart_restores_history_and_total(state_dir):
+    store = StateStore(state_dir, "demo", max_runs=2)
+    for fetched in (1, 2, 3):
+        store.record_run(_result(fetched=fetched))
+
+    service = _service(Sync())
+
+    assert service.runs.total_runs == 3
+    assert service.runs.latest["fetched"] == 3
+    assert service.health_body()["total_runs"] == 3
+
+
+def test_catch_up_due_without_state():
+    assert _service(Sync()).catch_up_due()
+
+
+def test_catch_up_skipped_after_recent_success(state_dir, monkeypatch):
+    monkeypatch.setenv("DEMO_SYNC_CRON", "0 0 1 * *")
+    _last_success(state_dir, datetime.now(timezone.utc))
+    service = _service(Sync())
+
+    assert not service.catch_up_due()
+
+
+def test_catch_up_runs_after_missed_fire_time(state_dir):
+    _last_success(state_dir, datetime.now(timezone.utc) - timedelta(hours=2))
+    service = _service(Sync())
+
+    assert service.catch_up_due()
+
+
+def test_schedule_queues_startup_sync_only_when_due(state_dir, monkeypatch):
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    monkeypatch.setenv("DEMO_SYNC_CRON", "0 0 1 * *")
+    _last_success(state_dir, datetime.now(timezone.utc))
+    current = BackgroundScheduler()
+    _service(Sync()).schedule(current)
+
+    StateStore(state_dir, "demo").path.unlink()
+    missed = BackgroundScheduler()
+    _service(Sync()).schedule(missed)
+
+    assert current.get_job("demo_sync") is not None
+    assert current.get_job("demo_initial_sync") is None
+    assert missed.get_job("demo_initial_sync") is not None
+
+
+def test_catch_up_run_skipped_when_another_process_completed_it(
+    state_dir, monkeypatch
+):
+    monkeypatch.setenv("DEMO_SYNC_CRON", "0 0 1 * *")
+    _last_success(state_dir, datetime.now(timezone.utc) - timedelta(days=40))
+    sync = Sync()
+    service = _service(sync)
+    assert service.catch_up_due()
+
+    # Another replica runs the missed sync before this one takes the lock.
+    _last_success(state_dir, datetime.now(timezone.utc))
+    service.run_job(catch_up=True)
+
+    assert sync.calls == 0
+    service.run_job()
+    assert sync.calls == 1
@@ -1,27 +1,118 @@
-"""Orchestrate fetching opening hours and storing in Strapi."""
+"""FastAPI service to sync Google Business opening hours into Strapi.
 
+`app` is built on first access (uvicorn's
+`google_business_opening_hours.main:app`), so the one-shot CLI never imports
+FastAPI or the scheduler.
+"""
+
+import os
 from datetime import datetime, timezone
+from typing import Any
 
 from dotenv import load_dotenv
 
-from google_business_opening_hours import outscraper, strapi
-
+# Load .env before the clients read their configuration on first import.
 load_dotenv()
 
+from core.sync_service import SyncService  # noqa: E402
+
+_INITIAL_RUN: dict[str, Any] = {
+    "status": "never_run",
+    "success": None,
+    "started_at": None,
+    "ended_at": None,
+    "duration_seconds": None,
+    "outcome": None,
+    "fetched_openinghours": 0,
+    "stored_openinghours": 0,
+    "updated_openinghours": 0,
+    "unchanged_openinghours": 0,
+    "error": None,
+}
+
+
+def _sync_opening_hours() -> dict[str, Any]:
+    """Fetch and store opening hours, returning run metadata for API responses."""
+    from google_business_opening_hours import outscraper, strapi
 
-def main() -> None:
-    """Fetch opening hours from Outscraper and store in Strapi."""
     start = datetime.now(timezone.utc)
-    print(f"[{start.isoformat()}] Fetching opening hours …")
-    openinghours = outscraper.fetch_opening_hours()
-    if openinghours:
-        strapi.store_openinghours(openinghours)
-    else:
-        print("  No opening hours data returned.")
+    try:
+        print(f"[{start.isoformat()}] Fetching opening hours …")
+        openinghours = outscraper.fetch_opening_hours()
+        if openinghours:
+            outcome = strapi.store_openinghours(openinghours)
+        else:
+            print("  No opening hours data returned.")
+            outcome = "no_data"
+
+        end = datetime.now(timezone.utc)
+        print(f"[{end.isoformat()}] Done (took {end - start}).")
+        return {
+            "status": "success",
+            "success": True,
+            "started_at": start.isoformat(),
+            "ended_at": end.isoformat(),
+            "duration_seconds": round((end - start).total_seconds(), 3),
+            "outcome": outcome,
+            "fetched_openinghours": 1 if openinghours else 0,
+            "stored_openinghours": 1 if outcome == "stored" else 0,
+            "updated_openinghours": 1 if outcome == "updated" else 0,
+            "unchanged_openinghours": 1 if outcome == "unchanged" else 0,
+            "error": None,
+        }
+    except Exception as exc:
+        end = datetime.now(timezone.utc)
+        return {
+            "status": "error",
+            "success": False,
+            "started_at": start.isoformat(),
+            "ended_at": end.isoformat(),
+            "duration_seconds": round((end - start).total_seconds(), 3),
+            "outcome": None,
+            "fetched_openinghours": 0,
+            "stored_openinghours": 0,
+            "updated_openinghours": 0,
+            "unchanged_openinghours": 0,
+            "error": str(exc),
+        }
+
 
-    end = datetime.now(timezone.utc)
-    print(f"\n[{end.isoformat()}] Done (took {end - start}).")
+SERVICE = SyncService(
+    name="opening_hours",
+    sync=_sync_opening_hours,
+    initial_run=_INITIAL_RUN,
+    cron_env="OPENINGHOURS_SYNC_CRON",
+    default_cron="0 3 * * *",
+    count_fields={
+        "fetched": "fetched_openinghours",
+        "stored": "stored_openinghours",
+        "updated": "updated_openinghours",
+        "unchanged": "unchanged_openinghours",
+    },
+)
+
+
+def __getattr__(name: str) -> Any:
+    """Build the FastAPI app lazily on first access to `app`."""
+    if name == "app":
+        from core.sync_service import create_app
+
+        app = create_app("Google Business Opening Hours Sync", [SERVICE])
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main() -> None:
+    """CLI compatibility entrypoint for one-shot sync runs."""
+    SERVICE.run_once()
 
 
 if __name__ == "__main__":
-    main()
+    import uvicorn
+
+    uvicorn.run(
+        "google_business_opening_hours.main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+    )
@@ -1,14 +1,57 @@
-"""Strapi API client for storing opening hours."""
+"""Strapi API client for upserting opening hours."""
 
+import json
 import os
 
-from core.strapi_client import PLACE_ID, post
+from core.strapi_client import PLACE_ID, attributes, entry_id, get, post, put
 
 OPENINGHOURS_COLLECTION = os.getenv("STRAPI_OPENINGHOURS_COLLECTION", "openinghours")
 
+# place_id -> Strapi entry id (documentId on Strapi 5, id on Strapi 4)
+_ENTRY_IDS: dict[str, str | int] = {}
 
-def store_openinghours(data: dict) -> None:
-    """Push opening hours into Strapi."""
+
+def _normalize(opening_hours: object) -> str:
+    """Return a canonical representation for change detection."""
+    return json.dumps(opening_hours, sort_keys=True, ensure_ascii=False)
+
+
+def _find_existing() -> dict | None:
+    """Return the current entry for PLACE_ID, using the cached id when known."""
+    params = {"fields[0]": "opening_hours"}
+    cached_id = _ENTRY_IDS.get(PLACE_ID)
+    if cached_id is not None:
+        resp = get(f"{OPENINGHOURS_COLLECTION}/{cached_id}", params)
+        if resp.status_code == 200 and resp.json().get("data"):
+            return resp.json()["data"]
+        _ENTRY_IDS.pop(PLACE_ID, None)
+
+    resp = get(
+        OPENINGHOURS_COLLECTION,
+        {
+            **params,
+            "filters[place_id][$eq]": PLACE_ID,
+            "pagination[pageSize]": 1,
+        },
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(
+            f"Strapi lookup failed for opening hours: "
+            f"status={resp.status_code}, body={resp.text}"
+        )
+    entries = resp.json().get("data") or []
+    if not entries:
+        return None
+    _ENTRY_IDS[PLACE_ID] = entry_id(entries[0])
+    return entries[0]
+
+
+def store_openinghours(data: dict) -> str:
+    """Upsert opening hours by place_id and return storage outcome.
+
+    Returns "stored" for a new entry, "updated" when the normalized hours
+    changed, and "unchanged" when no write was needed.
+    """
     payload = {
         "data": {
             "place_id": PLACE_ID,
@@ -16,6 +59,29 @@ def store_openinghours(data: dict) -> None:
             "raw": data.get("raw"),
         }
     }
-    resp = post(OPENINGHOURS_COLLECTION, payload)
-    if resp.status_code == 201:
+
+    existing = _find_existing()
+    if existing is None:
+        resp = post(OPENINGHOURS_COLLECTION, payload)
+        if resp.status_code not in (200, 201):
+            raise RuntimeError(
+                f"Strapi create failed for opening hours: "
+                f"status={resp.status_code}, body={resp.text}"
+            )
+        _ENTRY_IDS[PLACE_ID] = entry_id(resp.json()["data"])
         print("  ✓ opening hours stored")
+        return "stored"
+
+    current = attributes(existing).get("opening_hours")
+    if _normalize(current) == _normalize(data.get("opening_hours")):
+        print("  = opening hours unchanged")
+        return "unchanged"
+
+    resp = put(OPENINGHOURS_COLLECTION, entry_id(existing), payload)
+    if resp.status_code != 200:
+        raise RuntimeError(
+            f"Strapi update failed for opening hours: "
+            f"status={resp.status_code}, body={resp.text}"
+        )
+    print("  ✓ opening hours updated")
+    return "updated"
@@ -0,0 +1,212 @@
+"""Per-place review aggregates kept in Strapi.
+
+One aggregate entry per place holds the review count, mean rating, star
+histogram and the ids of the latest reviews, so readers fetch a single small
+document instead of every review. The sync updates it incrementally from
+newly stored reviews and rebuilds it whenever its review count disagrees
+with Strapi's; `gbr-aggregate` rebuilds it on demand.
+"""
+
+import os
+
+from core.metrics import traced
+from core.strapi_client import PLACE_ID, attributes, entry_id, get, post, put
+
+from google_business_review.strapi import REVIEWS_COLLECTION
+
+AGGREGATES_COLLECTION = os.getenv(
+    "STRAPI_REVIEW_AGGREGATES_COLLECTION", "reviewaggregates"
+)
+LATEST_REVIEWS_COUNT = int(os.getenv("AGGREGATE_LATEST_REVIEWS", "10"))
+RECOMPUTE_PAGE_SIZE = 100
+
+_FIELDS = (
+    "review_count",
+    "rated_count",
+    "rating_sum",
+    "average_rating",
+    "rating_histogram",
+    "latest_reviews",
+)
+
+
+def empty_aggregate() -> dict:
+    """Return the aggregate of a place without reviews."""
+    return {
+        "review_count": 0,
+        "rated_count": 0,
+        "rating_sum": 0,
+        "average_rating": None,
+        "rating_histogram": {str(stars): 0 for stars in range(1, 6)},
+        "latest_reviews": [],
+    }
+
+
+def add_reviews(aggregate: dict, reviews: list[dict]) -> dict:
+    """Return aggregate with reviews (Strapi review fields) folded in.
+
+    `latest_reviews` holds {review_id, review_date} pairs, newest first, so
+    later batches can be merged without re-reading older reviews.
+    """
+    result = {
+        **empty_aggregate(),
+        **{key: aggregate[key] for key in _FIELDS if key in aggregate},
+    }
+    histogram = dict(result["rating_histogram"])
+    latest = {item["review_id"]: item for item in result["latest_reviews"]}
+
+    for review in reviews:
+        result["review_count"] += 1
+        rating = review.get("rating")
+        if isinstance(rating, (int, float)) and 1 <= rating <= 5:
+            stars = str(int(round(rating)))
+            histogram[stars] = histogram.get(stars, 0) + 1
+            result["rated_count"] += 1
+            result["rating_sum"] += rating
+        latest[review["review_id"]] = {
+            "review_id": review["review_id"],
+            "review_date": review.get("review_date"),
+        }
+
+    result["rating_histogram"] = histogram
+    if result["rated_count"]:
+        result["average_rating"] = round(
+            result["rating_sum"] / result["rated_count"], 3
+        )
+    result["latest_reviews"] = sorted(
+        latest.values(), key=lambda item: item["review_date"] or "", reverse=True
+    )[:LATEST_REVIEWS_COUNT]
+    return result
+
+
+def _find_existing() -> dict | None:
+    resp = get(
+        AGGREGATES_COLLECTION,
+        {"filters[place_id][$eq]": PLACE_ID, "pagination[pageSize]": 1},
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(
+            f"Strapi lookup failed for review aggregate: "
+            f"status={resp.status_code}, body={resp.text}"
+        )
+    entries = resp.json().get("data") or []
+    return entries[0] if entries else None
+
+
+def _save(existing: dict | None, aggregate: dict) -> None:
+    payload = {"data": {"place_id": PLACE_ID, **aggregate}}
+    if existing is None:
+        resp = post(AGGREGATES_COLLECTION, payload)
+        expected = (200, 201)
+    else:
+        resp = put(AGGREGATES_COLLECTION, entry_id(existing), payload)
+        expected = (200,)
+    if resp.status_code not in expected:
+        raise RuntimeError(
+            f"Strapi write failed for review aggregate: "
+            f"status={resp.status_code}, body={resp.text}"
+        )
+
+
+def stored_review_count() -> int:
+    """Return the number of reviews stored for the place."""
+    resp = get(
+        REVIEWS_COLLECTION,
+        {
+            "filters[place_id][$eq]": PLACE_ID,
+            "fields[0]": "review_id",
+            "pagination[pageSize]": 1,
+        },
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(
+            f"Strapi review count failed: status={resp.status_code}, body={resp.text}"
+        )
+    return int(resp.json()["meta"]["pagination"]["total"])
+
+
+@traced("strapi.update_review_aggregate")
+def apply_new_reviews(reviews: list[dict]) -> str:
+    """Fold newly stored reviews into the place aggregate and save it.
+
+    The result is reconciled with the number of stored reviews on every
+    call. Without an existing aggregate, or when the counts disagree (reviews
+    stored by a run whose aggregate write failed, in this process or before
+    a restart), the aggregate is recomputed instead. Returns "updated",
+    "unchanged" or "recomputed".
+    """
+    existing = _find_existing()
+    if existing is None:
+        recompute()
+        return "recomputed"
+    aggregate = add_reviews(attributes(existing), reviews)
+    if aggregate["review_count"] != stored_review_count():
+        recompute()
+        return "recomputed"
+    if not reviews:
+        return "unchanged"
+    _save(existing, aggregate)
+    return "updated"
+
+
+def _iter_stored_reviews():
+    """Yield every stored review of the place, page by page."""
+    page = 1
+    while True:
+        resp = get(
+            REVIEWS_COLLECTION,
+            {
+                "filters[place_id][$eq]": PLACE_ID,
+                "fields[0]": "review_id",
+                "fields[1]": "rating",
+                "fields[2]": "review_date",
+                "sort": "id:asc",
+                "pagination[page]": page,
+                "pagination[pageSize]": RECOMPUTE_PAGE_SIZE,
+            },
+        )
+        if resp.status_code != 200:
+            raise RuntimeError(
+                f"Strapi review listing failed: "
+                f"status={resp.status_code}, body={resp.text}"
+            )
+        body = resp.json()
+        for entry in body.get("data") or []:
+            yield attributes(entry)
+        page_count = (
+            body.get("meta", {}).get("pagination", {}).get("pageCount", page)
+        )
+        if page >= page_count or not body.get("data"):
+            return
+        page += 1
+
+
+@traced("strapi.recompute_review_aggregate")
+def recompute() -> dict:
+    """Rebuild the place aggregate from all stored reviews and save it."""
+    aggregate = empty_aggregate()
+    batch: list[dict] = []
+    for review in _iter_stored_reviews():
+        batch.append(review)
+        if len(batch) >= RECOMPUTE_PAGE_SIZE:
+            aggregate = add_reviews(aggregate, batch)
+            batch = []
+    aggregate = add_reviews(aggregate, batch)
+    _save(_find_existing(), aggregate)
+    return aggregate
+
+
+def main() -> None:
+    """CLI entrypoint: recompute the review aggregate for GOOGLE_PLACE_ID."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    aggregate = recompute()
+    print(
+        f"✓ {aggregate['review_count']} reviews, "
+        f"average {aggregate['average_rating']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 #!/usr/bin/env python
-"""Generate Strapi schema for the reviews collection."""
+"""Generate Strapi schemas for the reviews and review aggregates collections."""
 
-import json
 from pathlib import Path
 
+from core.schema_codegen import Index, generate
+
 
 REVIEW_SCHEMA = {
     "kind": "collectionType",
@@ -49,79 +50,73 @@ REVIEW_SCHEMA = {
     },
 }
 
+# Hot queries: get_review_cutoff_unix filters by place_id and sorts by
+# updatedAt, listings filter by place_id and sort by review_date, and every
+# create looks up the unique review_id.
+REVIEW_INDEXES = (
+    Index(("place_id", "updated_at")),
+    Index(("place_id", "review_date")),
+    Index(("review_id",)),
+)
 
-# TypeScript file templates
-CONTROLLER_TEMPLATE = """/**
- * {singular} controller
- */
-
-import {{ factories }} from '@strapi/strapi';
-
-export default factories.createCoreController('api::{singular}.{singular}');
-"""
-
-ROUTE_TEMPLATE = """/**
- * {singular} router
- */
-
-import {{ factories }} from '@strapi/strapi';
-
-export default factories.createCoreRouter('api::{singular}.{singular}');
-"""
-
-SERVICE_TEMPLATE = """/**
- * {singular} service
- */
-
-import {{ factories }} from '@strapi/strapi';
-
-export default factories.createCoreService('api::{singular}.{singular}');
-"""
-
-
-def create_api_structure(base_path: Path, name: str, schema: dict) -> None:
-    """Create complete Strapi API structure for a content type."""
-    singular = schema["info"]["singularName"]
-
-    api_path = base_path / name
-    controllers_path = api_path / "controllers"
-    routes_path = api_path / "routes"
-    services_path = api_path / "services"
-    content_types_path = api_path / "content-types" / singular
-
-    controllers_path.mkdir(parents=True, exist_ok=True)
-    routes_path.mkdir(parents=True, exist_ok=True)
-    services_path.mkdir(parents=True, exist_ok=True)
-    content_types_path.mkdir(parents=True, exist_ok=True)
-
-    (controllers_path / f"{singular}.ts").write_text(
-        CONTROLLER_TEMPLATE.format(singular=singular), encoding="utf-8"
-    )
-    (routes_path / f"{singular}.ts").write_text(
-        ROUTE_TEMPLATE.format(singular=singular), encoding="utf-8"
-    )
-    (services_path / f"{singular}.ts").write_text(
-        SERVICE_TEMPLATE.format(singular=singular), encoding="utf-8"
-    )
-    (content_types_path / "schema.json").write_text(
-        json.dumps(schema, indent=2), encoding="utf-8"
-    )
+REVIEW_AGGREGATE_SCHEMA = {
+    "kind": "collectionType",
+    "collectionName": "reviewaggregates",
+    "info": {
+        "singularName": "reviewaggregate",
+        "pluralName": "reviewaggregates",
+        "displayName": "Google Business Review Aggregate",
+        "description": "Review count, rating and latest reviews per place",
+    },
+    "options": {
+        "draftAndPublish": False,
+    },
+    "pluginOptions": {},
+    "attributes": {
+        "place_id": {
+            "type": "string",
+            "required": True,
+            "unique": True,
+        },
+        "review_count": {
+            "type": "integer",
+        },
+        "rated_count": {
+            "type": "integer",
+        },
+        "rating_sum": {
+            "type": "integer",
+        },
+        "average_rating": {
+            "type": "float",
+        },
+        "rating_histogram": {
+            "type": "json",
+        },
+        "latest_reviews": {
+            "type": "json",
+        },
+    },
+}
 
-    print(f"✓ Generated {name}/")
+# Readers and the sync look the aggregate up by place_id only.
+REVIEW_AGGREGATE_INDEXES = (Index(("place_id",), unique=True),)
 
 
 def main() -> None:
-    """Generate Strapi API structure for reviews collection."""
-    script_dir = Path(__file__).parent.parent.parent
-    base_path = script_dir / "generated_strapi_types"
-    base_path.mkdir(exist_ok=True)
-
-    print("Generating Strapi API structure …\n")
-    create_api_structure(base_path, "review", REVIEW_SCHEMA)
-
-    print("\nTo use in Strapi:")
-    print("  cp -r generated_strapi_types/review/* <strapi>/src/api/review/")
-    print("  Restart Strapi.")
+    """Generate Strapi API structures for reviews and review aggregates."""
+    project_dir = Path(__file__).parent.parent.parent
+    generate(
+        project_dir,
+        [
+            ("review", REVIEW_SCHEMA, REVIEW_INDEXES),
+            (
+                "reviewaggregate",
+                REVIEW_AGGREGATE_SCHEMA,
+                REVIEW_AGGREGATE_INDEXES,
+            ),
+        ],
+    )
 
 
 if __name__ == "__main__":
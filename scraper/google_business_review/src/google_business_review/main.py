@@ -1,32 +1,21 @@
-"""FastAPI service to sync Google Business reviews into Strapi."""
+"""FastAPI service to sync Google Business reviews into Strapi.
+
+`app` is built on first access (uvicorn's `google_business_review.main:app`),
+so the one-shot CLI never imports FastAPI or the scheduler.
+"""
 
 from datetime import datetime, timezone
-import logging
 import os
-from threading import Lock
 from typing import Any
 
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
 from dotenv import load_dotenv
-from fastapi import FastAPI
-
-import google_business_review.outscraper as outscraper
-import google_business_review.strapi as strapi
 
+# Load .env before the clients read their configuration on first import.
 load_dotenv()
 
-# Skip logging for health endpoint
-class _SkipHealthCheckFilter(logging.Filter):
-    def filter(self, record):
-        return "/health" not in record.getMessage()
-
-logging.getLogger("uvicorn.access").addFilter(_SkipHealthCheckFilter())
+from core.sync_service import SyncService  # noqa: E402
 
-app = FastAPI(title="Google Business Review Sync", version="0.1.0")
-_RUN_LOCK = Lock()
-_SCHEDULER: BackgroundScheduler | None = None
-_LATEST_RUN: dict[str, Any] = {
+_INITIAL_RUN: dict[str, Any] = {
     "status": "never_run",
     "success": None,
     "started_at": None,
@@ -39,14 +28,31 @@ _LATEST_RUN: dict[str, Any] = {
     "stored_reviews": 0,
     "skipped_reviews": 0,
     "ignored_reviews": 0,
+    "aggregate_status": None,
     "error": None,
 }
 
-_SYNC_CRON_ENV = "REVIEW_SYNC_CRON"
+
+def _update_aggregate(stored: list[dict]) -> str:
+    """Update the review aggregate without failing the sync on errors.
+
+    A failed update needs no bookkeeping here: the next run finds the
+    aggregate's review count out of date and recomputes it.
+    """
+    import google_business_review.aggregates as aggregates
+
+    try:
+        return aggregates.apply_new_reviews(stored)
+    except Exception as exc:
+        print(f"Review aggregate update failed: {exc}")
+        return "failed"
 
 
 def _sync_reviews() -> dict[str, Any]:
     """Fetch and store reviews, returning run metadata for API responses."""
+    import google_business_review.outscraper as outscraper
+    import google_business_review.strapi as strapi
+
     start = datetime.now(timezone.utc)
     try:
         cutoff_unix = strapi.get_review_cutoff_unix()
@@ -55,10 +61,13 @@ def _sync_reviews() -> dict[str, Any]:
         stored_reviews = 0
         skipped_reviews = 0
         ignored_reviews = 0
+        stored: list[dict] = []
         for review in reviews:
-            outcome = strapi.store_review(review)
+            data = strapi.review_data(review)
+            outcome = strapi.store_review(data)
             if outcome == "stored":
                 stored_reviews += 1
+                stored.append(data)
             elif outcome == "skipped":
                 skipped_reviews += 1
             else:
@@ -70,6 +79,7 @@ def _sync_reviews() -> dict[str, Any]:
         )
         if not reviews:
             data_source = "no_new_reviews"
+        aggregate_status = _update_aggregate(stored)
 
         return {
             "status": "success",
@@ -84,6 +94,7 @@ def _sync_reviews() -> dict[str, Any]:
             "stored_reviews": stored_reviews,
             "skipped_reviews": skipped_reviews,
             "ignored_reviews": ignored_reviews,
+            "aggregate_status": aggregate_status,
             "error": None,
         }
     except Exception as exc:
@@ -101,98 +112,40 @@ def _sync_reviews() -> dict[str, Any]:
             "stored_reviews": 0,
             "skipped_reviews": 0,
             "ignored_reviews": 0,
+            "aggregate_status": None,
             "error": str(exc),
         }
 
 
-def _run_sync_job() -> None:
-    """Run one sync job if another run is not already in progress."""
-    if not _RUN_LOCK.acquire(blocking=False):
-        logging.getLogger(__name__).warning(
-            "Skipping scheduled sync because a sync run is already in progress."
-        )
-        return
-
-    global _LATEST_RUN
-    try:
-        result = _sync_reviews()
-        _LATEST_RUN = result
-    finally:
-        _RUN_LOCK.release()
-
-
-def _build_scheduler() -> BackgroundScheduler:
-    """Create a cron scheduler using environment-based cron configuration."""
-    cron_expression = os.getenv(_SYNC_CRON_ENV, "0 * * * *").strip()
-
-    try:
-        trigger = CronTrigger.from_crontab(cron_expression)
-    except ValueError as exc:
-        raise RuntimeError(
-            f"Invalid cron expression '{cron_expression}' from {_SYNC_CRON_ENV}."
-        ) from exc
-
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(
-        _run_sync_job,
-        trigger=trigger,
-        id="google_business_review_sync",
-        replace_existing=True,
-        coalesce=True,
-        max_instances=1,
-        misfire_grace_time=300,
-    )
-
-    logging.getLogger(__name__).info(
-        "Scheduled review sync configured with cron '%s'.",
-        cron_expression,
-    )
-    return scheduler
-
-
-@app.on_event("startup")
-def start_scheduler() -> None:
-    """Run an initial sync and start the cron scheduler when the API starts."""
-    global _SCHEDULER
-    _run_sync_job()
-    scheduler = _build_scheduler()
-    scheduler.start()
-    _SCHEDULER = scheduler
-
-
-@app.on_event("shutdown")
-def stop_scheduler() -> None:
-    """Shutdown the cron scheduler when the API stops."""
-    global _SCHEDULER
-    if _SCHEDULER is not None:
-        _SCHEDULER.shutdown(wait=False)
-        _SCHEDULER = None
-
+SERVICE = SyncService(
+    name="reviews",
+    sync=_sync_reviews,
+    initial_run=_INITIAL_RUN,
+    cron_env="REVIEW_SYNC_CRON",
+    default_cron="0 * * * *",
+    count_fields={
+        "fetched": "fetched_reviews",
+        "stored": "stored_reviews",
+        "skipped": "skipped_reviews",
+        "ignored": "ignored_reviews",
+    },
+)
 
-@app.get("/health")
-def health() -> dict[str, Any]:
-    """Return API status and metadata for the latest sync execution."""
-    status = "ok"
-    if _LATEST_RUN["status"] == "error":
-        status = "error"
 
-    cron_expression = os.getenv(_SYNC_CRON_ENV, "0 * * * *")
+def __getattr__(name: str) -> Any:
+    """Build the FastAPI app lazily on first access to `app`."""
+    if name == "app":
+        from core.sync_service import create_app
 
-    return {
-        "status": status,
-        "scheduler": {
-            "cron": cron_expression,
-        },
-        "latest_run": _LATEST_RUN,
-    }
+        app = create_app("Google Business Review Sync", [SERVICE])
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def main() -> None:
     """CLI compatibility entrypoint for one-shot sync runs."""
-    result = _sync_reviews()
-    print(result)
-    if not result["success"]:
-        raise SystemExit(1)
+    SERVICE.run_once()
 
 
 if __name__ == "__main__":
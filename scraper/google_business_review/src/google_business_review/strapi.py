@@ -3,11 +3,13 @@
 from datetime import datetime, timezone
 import os
 
+from core.metrics import traced
 from core.strapi_client import PLACE_ID, get, post, parse_datetime
 
 REVIEWS_COLLECTION = os.getenv("STRAPI_REVIEWS_COLLECTION", "reviews")
 
 
+@traced("strapi.get_review_cutoff_unix")
 def get_review_cutoff_unix() -> int:
     """Return Unix cutoff timestamp for review sync."""
     resp = get(
@@ -29,26 +31,32 @@ def get_review_cutoff_unix() -> int:
     return int(os.getenv("REVIEWS_CUTOFF_UNIX", "0"))
 
 
-def store_review(raw: dict) -> str:
-    """Push one review into Strapi and return storage outcome."""
+def review_data(raw: dict) -> dict | None:
+    """Map an Outscraper review to Strapi fields, or None without an id."""
     review_id = str(raw.get("review_id", raw.get("review_link", "")))
     if not review_id:
-        return "ignored"
+        return None
 
-    payload = {
-        "data": {
-            "place_id": PLACE_ID,
-            "review_id": review_id,
-            "author_name": raw.get("author_title", ""),
-            "rating": raw.get("review_rating"),
-            "text": raw.get("review_text", ""),
-            "review_url": raw.get("review_link", ""),
-            "review_date": parse_datetime(raw.get("review_datetime_utc")),
-            "raw": raw,
-        }
+    return {
+        "place_id": PLACE_ID,
+        "review_id": review_id,
+        "author_name": raw.get("author_title", ""),
+        "rating": raw.get("review_rating"),
+        "text": raw.get("review_text", ""),
+        "review_url": raw.get("review_link", ""),
+        "review_date": parse_datetime(raw.get("review_datetime_utc")),
+        "raw": raw,
     }
 
-    resp = post(REVIEWS_COLLECTION, payload)
+
+@traced("strapi.store_review")
+def store_review(data: dict | None) -> str:
+    """Push one review (as mapped by review_data) and return storage outcome."""
+    if data is None:
+        return "ignored"
+    review_id = data["review_id"]
+
+    resp = post(REVIEWS_COLLECTION, {"data": data})
     if resp.status_code == 201:
         print(f"  ✓ {review_id[:40]}")
         return "stored"
@@ -0,0 +1 @@
+"""Google Business review and opening-hours syncs in one process."""
@@ -0,0 +1,54 @@
+"""FastAPI service running the review and opening-hours syncs together.
+
+Both services share one scheduler; per-service health and history are under
+`/reviews/...` and `/opening_hours/...`. `app` is built on first access
+(uvicorn's `google_business_sync.main:app`), so the one-shot CLI never
+imports FastAPI or the scheduler.
+"""
+
+import os
+from typing import Any
+
+from dotenv import load_dotenv
+
+# Load .env before the clients read their configuration on first import.
+load_dotenv()
+
+from google_business_opening_hours.main import (  # noqa: E402
+    SERVICE as OPENING_HOURS_SERVICE,
+)
+from google_business_review.main import SERVICE as REVIEW_SERVICE  # noqa: E402
+
+SERVICES = [REVIEW_SERVICE, OPENING_HOURS_SERVICE]
+
+
+def __getattr__(name: str) -> Any:
+    """Build the FastAPI app lazily on first access to `app`."""
+    if name == "app":
+        from core.sync_service import create_app
+
+        app = create_app("Google Business Sync", SERVICES)
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main() -> None:
+    """CLI entrypoint: run every sync once, failing if any run failed."""
+    failed = False
+    for service in SERVICES:
+        result = service.sync()
+        print(f"{service.name}: {result}")
+        failed = failed or not result["success"]
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "google_business_sync.main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+    )
@@ -0,0 +1 @@
+"""Instagram feed sync — posts and compact media thumbnails."""
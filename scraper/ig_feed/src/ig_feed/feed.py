@@ -0,0 +1,89 @@
+"""Instagram Graph API client for the account's media feed."""
+
+import os
+from datetime import datetime
+
+from core.http_cache import conditional_headers, validators
+from core.metrics import traced
+from core.resilience import get_upstream
+
+GRAPH_URL = os.getenv("IG_GRAPH_URL", "https://graph.instagram.com").rstrip("/")
+ACCESS_TOKEN = os.getenv("IG_ACCESS_TOKEN", "")
+USER_ID = os.getenv("IG_USER_ID", "me")
+PAGE_SIZE = int(os.getenv("IG_FEED_PAGE_SIZE", "25"))
+MAX_POSTS = int(os.getenv("IG_FEED_MAX_POSTS", "200"))
+FIELDS = "id,caption,media_type,media_url,thumbnail_url,permalink,timestamp"
+
+UPSTREAM = get_upstream("instagram", rate_per_second=2.0, burst=4)
+
+
+def _timestamp(raw: str | None) -> datetime | None:
+    try:
+        return datetime.fromisoformat(raw) if raw else None
+    except ValueError:
+        return None
+
+
+def _is_known(post: dict, watermark: dict | None) -> bool:
+    if not watermark:
+        return False
+    if post.get("id") == watermark.get("media_id"):
+        return True
+    # The watermark post may have been deleted on Instagram; anything older
+    # than it has been synced already. Posts from the same second may have
+    # been published after the last run, so they are kept and store_post
+    # skips the ones already stored.
+    posted_at = _timestamp(watermark.get("posted_at"))
+    timestamp = _timestamp(post.get("timestamp"))
+    return bool(posted_at and timestamp and timestamp < posted_at)
+
+
+@traced("instagram.fetch_new_posts")
+def fetch_new_posts(
+    watermark: dict | None, cached: dict | None = None
+) -> tuple[list[dict] | None, dict]:
+    """Return posts newer than watermark (newest first) and feed validators.
+
+    The feed is paged newest first and paging stops at the first known post,
+    so the number of requests grows with new posts only. Every post newer
+    than the watermark is returned, since posts behind the next watermark
+    would never be synced; MAX_POSTS only caps the first sync, which has no
+    watermark. The first page is
+    requested conditionally with the validators in `cached`; on 304 the
+    posts are None and the cached validators are returned unchanged.
+    """
+    resp = UPSTREAM.request(
+        "GET",
+        f"{GRAPH_URL}/{USER_ID}/media",
+        params={
+            "fields": FIELDS,
+            "limit": PAGE_SIZE,
+            "access_token": ACCESS_TOKEN,
+        },
+        headers=conditional_headers(cached),
+        timeout=30,
+    )
+    if resp.status_code == 304:
+        return None, dict(cached or {})
+    resp.raise_for_status()
+    first_page = validators(resp)
+
+    posts: list[dict] = []
+    body = resp.json()
+    while True:
+        for post in body.get("data") or []:
+            if _is_known(post, watermark):
+                return posts, first_page
+            if watermark is None and len(posts) >= MAX_POSTS:
+                print(
+                    f"First sync keeps the newest {MAX_POSTS} posts; "
+                    f"older posts are not synced (IG_FEED_MAX_POSTS)"
+                )
+                return posts, first_page
+            posts.append(post)
+        next_url = (body.get("paging") or {}).get("next")
+        if not next_url:
+            return posts, first_page
+        resp = UPSTREAM.request("GET", next_url, timeout=30)
+        resp.raise_for_status()
+        body = resp.json()
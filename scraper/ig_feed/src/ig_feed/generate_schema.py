@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""Generate Strapi schemas for the Instagram posts and media collections."""
+
+from pathlib import Path
+
+from core.schema_codegen import Index, generate
+
+IG_POST_SCHEMA = {
+    "kind": "collectionType",
+    "collectionName": "igposts",
+    "info": {
+        "singularName": "igpost",
+        "pluralName": "igposts",
+        "displayName": "Instagram Post",
+        "description": "Posts from the Instagram feed",
+    },
+    "options": {
+        "draftAndPublish": False,
+    },
+    "pluginOptions": {},
+    "attributes": {
+        "media_id": {
+            "type": "string",
+            "required": True,
+            "unique": True,
+        },
+        "caption": {
+            "type": "text",
+        },
+        "media_type": {
+            "type": "string",
+        },
+        "permalink": {
+            "type": "string",
+        },
+        "posted_at": {
+            "type": "datetime",
+        },
+        "content_hash": {
+            "type": "string",
+        },
+        "raw": {
+            "type": "json",
+        },
+    },
+}
+
+IG_MEDIA_SCHEMA = {
+    "kind": "collectionType",
+    "collectionName": "igmedias",
+    "info": {
+        "singularName": "igmedia",
+        "pluralName": "igmedias",
+        "displayName": "Instagram Media",
+        "description": "WebP thumbnails of Instagram media, one per content hash",
+    },
+    "options": {
+        "draftAndPublish": False,
+    },
+    "pluginOptions": {},
+    "attributes": {
+        "content_hash": {
+            "type": "string",
+            "required": True,
+            "unique": True,
+        },
+        "thumbnail": {
+            "type": "text",
+        },
+        "width": {
+            "type": "integer",
+        },
+        "height": {
+            "type": "integer",
+        },
+        "source_bytes": {
+            "type": "integer",
+        },
+    },
+}
+
+# get_watermark sorts by posted_at on every run, and every create looks up
+# the unique media_id / content_hash.
+IG_POST_INDEXES = (
+    Index(("posted_at",)),
+    Index(("media_id",)),
+)
+IG_MEDIA_INDEXES = (Index(("content_hash",)),)
+
+
+def main() -> None:
+    """Generate Strapi API structures for Instagram posts and media."""
+    project_dir = Path(__file__).parent.parent.parent
+    generate(
+        project_dir,
+        [
+            ("igpost", IG_POST_SCHEMA, IG_POST_INDEXES),
+            ("igmedia", IG_MEDIA_SCHEMA, IG_MEDIA_INDEXES),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""FastAPI service to sync the Instagram feed into Strapi.
+
+`app` is built on first access (uvicorn's `ig_feed.main:app`), so the
+one-shot CLI never imports FastAPI or the scheduler.
+"""
+
+import os
+from datetime import datetime, timezone
+from typing import Any
+
+from dotenv import load_dotenv
+
+# Load .env before the clients read their configuration on first import.
+load_dotenv()
+
+from core.sync_service import SyncService  # noqa: E402
+
+_INITIAL_RUN: dict[str, Any] = {
+    "status": "never_run",
+    "success": None,
+    "started_at": None,
+    "ended_at": None,
+    "duration_seconds": None,
+    "feed_not_modified": None,
+    "fetched_posts": 0,
+    "stored_posts": 0,
+    "skipped_posts": 0,
+    "downloaded_media": 0,
+    "not_modified_media": 0,
+    "deduplicated_media": 0,
+    "downloaded_bytes": 0,
+    "error": None,
+}
+
+_FEED_CACHE_KEY = "feed"
+_cache = None
+
+
+def _validator_cache():
+    """Return the process-wide validator cache, created on first use."""
+    from core.http_cache import ValidatorCache
+
+    global _cache
+    if _cache is None:
+        _cache = ValidatorCache.from_env("ig_feed")
+    return _cache
+
+
+def _sync_feed() -> dict[str, Any]:
+    """Fetch new posts and their media, returning run metadata."""
+    from ig_feed import feed, media, strapi
+
+    start = datetime.now(timezone.utc)
+    cache = _validator_cache()
+    counts = {
+        "stored_posts": 0,
+        "skipped_posts": 0,
+        "downloaded_media": 0,
+        "not_modified_media": 0,
+        "deduplicated_media": 0,
+        "downloaded_bytes": 0,
+    }
+    try:
+        watermark = strapi.get_watermark()
+        watermark_id = (watermark or {}).get("media_id")
+        cached_feed = cache.get(_FEED_CACHE_KEY)
+        # Feed validators only hold while Strapi still has the posts they
+        # were recorded for (e.g. not after the collection was emptied).
+        if cached_feed and cached_feed.get("watermark") != watermark_id:
+            cached_feed = None
+        posts, feed_validators = feed.fetch_new_posts(watermark, cached_feed)
+        feed_not_modified = posts is None
+        # Store oldest first: the watermark is the newest stored post, so an
+        # interrupted run must not leave older new posts behind it.
+        posts = list(reversed(posts or []))
+
+        fetched = media.fetch_all(
+            posts, {post["id"]: cache.get(f"media:{post['id']}") for post in posts}
+        )
+        for post, item in fetched:
+            if item is not None:
+                if item.not_modified:
+                    counts["not_modified_media"] += 1
+                else:
+                    counts["downloaded_media"] += 1
+                    counts["downloaded_bytes"] += len(item.content)
+
+                if strapi.media_exists(item.content_hash):
+                    if not item.not_modified:
+                        counts["deduplicated_media"] += 1
+                else:
+                    if item.not_modified:
+                        # Validators outlived the media entry; fetch it again.
+                        item = media.fetch_media(post)
+                        counts["downloaded_media"] += 1
+                        counts["downloaded_bytes"] += len(item.content)
+                    strapi.store_media(
+                        item.content_hash,
+                        media.make_thumbnail(item.content),
+                        len(item.content),
+                    )
+                cache.set(f"media:{post['id']}", item.cache_entry())
+
+            outcome = strapi.store_post(post, item.content_hash if item else None)
+            counts[f"{outcome}_posts"] += 1
+
+        # Only remember the feed validators once every new post is stored,
+        # otherwise a 304 would hide the posts a failed run left behind.
+        if posts:
+            watermark_id = posts[-1]["id"]
+        cache.set(_FEED_CACHE_KEY, {**feed_validators, "watermark": watermark_id})
+        cache.save()
+
+        end = datetime.now(timezone.utc)
+        return {
+            "status": "success",
+            "success": True,
+            "started_at": start.isoformat(),
+            "ended_at": end.isoformat(),
+            "duration_seconds": round((end - start).total_seconds(), 3),
+            "feed_not_modified": feed_not_modified,
+            "fetched_posts": len(posts),
+            **counts,
+            "error": None,
+        }
+    except Exception as exc:
+        cache.save()
+        end = datetime.now(timezone.utc)
+        return {
+            **_INITIAL_RUN,
+            "status": "error",
+            "success": False,
+            "started_at": start.isoformat(),
+            "ended_at": end.isoformat(),
+            "duration_seconds": round((end - start).total_seconds(), 3),
+            "error": str(exc),
+        }
+
+
+SERVICE = SyncService(
+    name="ig_feed",
+    sync=_sync_feed,
+    initial_run=_INITIAL_RUN,
+    cron_env="IG_FEED_SYNC_CRON",
+    default_cron="*/30 * * * *",
+    count_fields={
+        "fetched": "fetched_posts",
+        "stored": "stored_posts",
+        "skipped": "skipped_posts",
+        "downloaded": "downloaded_media",
+        "not_modified": "not_modified_media",
+        "deduplicated": "deduplicated_media",
+    },
+)
+
+
+def __getattr__(name: str) -> Any:
+    """Build the FastAPI app lazily on first access to `app`."""
+    if name == "app":
+        from core.sync_service import create_app
+
+        app = create_app("Instagram Feed Sync", [SERVICE])
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main() -> None:
+    """CLI entrypoint for one-shot sync runs."""
+    SERVICE.run_once()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "ig_feed.main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+    )
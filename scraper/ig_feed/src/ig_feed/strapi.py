@@ -0,0 +1,118 @@
+"""Strapi API client for storing Instagram posts and media thumbnails."""
+
+import os
+
+from core.metrics import traced
+from core.strapi_client import attributes, get, parse_datetime, post
+
+POSTS_COLLECTION = os.getenv("STRAPI_IG_POSTS_COLLECTION", "igposts")
+MEDIA_COLLECTION = os.getenv("STRAPI_IG_MEDIA_COLLECTION", "igmedias")
+
+# Content hashes known to have a media entry, so repeated images (and
+# reruns within one process) skip the lookup.
+_KNOWN_HASHES: set[str] = set()
+
+
+@traced("strapi.get_ig_watermark")
+def get_watermark() -> dict | None:
+    """Return media_id and posted_at of the newest stored post, if any."""
+    resp = get(
+        POSTS_COLLECTION,
+        {
+            "sort": "posted_at:desc",
+            "fields[0]": "media_id",
+            "fields[1]": "posted_at",
+            "pagination[pageSize]": 1,
+        },
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(
+            f"Strapi lookup failed for Instagram watermark: "
+            f"status={resp.status_code}, body={resp.text}"
+        )
+    entries = resp.json().get("data") or []
+    if not entries:
+        return None
+    entry = attributes(entries[0])
+    return {"media_id": entry.get("media_id"), "posted_at": entry.get("posted_at")}
+
+
+def media_exists(content_hash: str) -> bool:
+    """Return whether a media entry with this content hash is stored."""
+    if content_hash in _KNOWN_HASHES:
+        return True
+    resp = get(
+        MEDIA_COLLECTION,
+        {
+            "filters[content_hash][$eq]": content_hash,
+            "fields[0]": "content_hash",
+            "pagination[pageSize]": 1,
+        },
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(
+            f"Strapi lookup failed for media {content_hash[:12]}: "
+            f"status={resp.status_code}, body={resp.text}"
+        )
+    if resp.json().get("data"):
+        _KNOWN_HASHES.add(content_hash)
+        return True
+    return False
+
+
+@traced("strapi.store_ig_media")
+def store_media(content_hash: str, thumbnail: dict, source_bytes: int) -> str:
+    """Create the media entry for a content hash and return storage outcome."""
+    resp = post(
+        MEDIA_COLLECTION,
+        {
+            "data": {
+                "content_hash": content_hash,
+                "source_bytes": source_bytes,
+                **thumbnail,
+            }
+        },
+    )
+    if resp.status_code in (200, 201):
+        _KNOWN_HASHES.add(content_hash)
+        return "stored"
+    if resp.status_code == 400:
+        # Unique conflict: an identical image was stored concurrently.
+        _KNOWN_HASHES.add(content_hash)
+        return "skipped"
+
+    raise RuntimeError(
+        f"Strapi create failed for media {content_hash[:12]}: "
+        f"status={resp.status_code}, body={resp.text}"
+    )
+
+
+@traced("strapi.store_ig_post")
+def store_post(raw: dict, content_hash: str | None) -> str:
+    """Push one post into Strapi and return storage outcome."""
+    media_id = str(raw["id"])
+    resp = post(
+        POSTS_COLLECTION,
+        {
+            "data": {
+                "media_id": media_id,
+                "caption": raw.get("caption", ""),
+                "media_type": raw.get("media_type"),
+                "permalink": raw.get("permalink", ""),
+                "posted_at": parse_datetime(raw.get("timestamp")),
+                "content_hash": content_hash,
+                "raw": raw,
+            }
+        },
+    )
+    if resp.status_code in (200, 201):
+        print(f"  ✓ {media_id}")
+        return "stored"
+    elif resp.status_code == 400:
+        print(f"  ↳ skip {media_id}")
+        return "skipped"
+
+    raise RuntimeError(
+        f"Strapi create failed for post {media_id}: "
+        f"status={resp.status_code}, body={resp.text}"
+    )
@@ -0,0 +1,230 @@
+"""Fixtures for the offline sync benchmarks.
+
+Dataset size, latency and error rate are read from the environment so the
+same suite can run as a quick smoke test or a heavier load test:
+
+    BENCH_REVIEWS=2000 BENCH_POSTS=500 BENCH_LATENCY_MS=20 BENCH_ERROR_RATE=0.05 \
+        uv run pytest -m benchmark
+
+Injected errors are transient 503s that the upstream retries are expected to
+absorb, so every scenario still asserts its outcome; a rate the retries cannot
+ride out shows up as a failed benchmark.
+
+Results are written to a JSON report (BENCHMARK_REPORT, default
+.benchmarks/report.json under the pytest rootdir) that can be diffed between
+runs.
+"""
+
+import json
+import os
+import platform
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import pytest
+from stubs import InstagramStub, OutscraperStub, StrapiStub, StubConfig
+
+from core import metrics, resilience
+
+BENCH_REVIEWS = int(os.getenv("BENCH_REVIEWS", "200"))
+BENCH_POSTS = int(os.getenv("BENCH_POSTS", "60"))
+BENCH_LATENCY_SECONDS = float(os.getenv("BENCH_LATENCY_MS", "0")) / 1000
+BENCH_ERROR_RATE = float(os.getenv("BENCH_ERROR_RATE", "0"))
+BENCH_RATE_LIMIT = os.getenv("BENCH_RATE_LIMIT", "0") == "1"
+BENCHMARK_REPORT = os.getenv("BENCHMARK_REPORT")
+
+_RESULTS: list[dict[str, Any]] = []
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    """Return nearest-rank latency percentiles in milliseconds."""
+    ordered = sorted(samples)
+
+    def rank(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "p50_ms": rank(0.50),
+        "p95_ms": rank(0.95),
+        "p99_ms": rank(0.99),
+        "max_ms": rank(1.0),
+    }
+
+
+def pytest_sessionfinish(session, exitstatus) -> None:
+    """Write the collected benchmark results as one JSON document."""
+    if not _RESULTS:
+        return
+    path = Path(BENCHMARK_REPORT or session.config.rootpath / ".benchmarks/report.json")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "parameters": {
+            "reviews": BENCH_REVIEWS,
+            "posts": BENCH_POSTS,
+            "latency_ms": BENCH_LATENCY_SECONDS * 1000,
+            "error_rate": BENCH_ERROR_RATE,
+            "rate_limit": BENCH_RATE_LIMIT,
+        },
+        "results": _RESULTS,
+    }
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+@pytest.fixture
+def bench_reviews() -> int:
+    return BENCH_REVIEWS
+
+
+@pytest.fixture
+def bench_posts() -> int:
+    return BENCH_POSTS
+
+
+@pytest.fixture
+def stub_config() -> StubConfig:
+    return StubConfig(
+        latency_seconds=BENCH_LATENCY_SECONDS,
+        error_rate=BENCH_ERROR_RATE,
+    )
+
+
+@pytest.fixture
+def no_errors(stub_config) -> None:
+    """Disable injected errors for benchmarks that check exact results."""
+    stub_config.error_rate = 0
+
+
+@pytest.fixture
+def outscraper_stub(stub_config, monkeypatch) -> Iterator[OutscraperStub]:
+    """Start an Outscraper stand-in and point core.outscraper_client at it."""
+    import core.outscraper_client as client
+
+    stub = OutscraperStub(stub_config, reviews=BENCH_REVIEWS).start()
+    monkeypatch.setattr(client, "BASE_URL", stub.url)
+    monkeypatch.setattr(client, "POLL_INTERVAL_SECONDS", 0.01)
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def strapi_stub(stub_config, monkeypatch) -> Iterator[StrapiStub]:
+    """Start a Strapi stand-in and point core.strapi_client at it."""
+    import core.strapi_client as client
+
+    stub = StrapiStub(stub_config).start()
+    monkeypatch.setattr(client, "STRAPI_URL", stub.url)
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def instagram_stub(stub_config, monkeypatch) -> Iterator[InstagramStub]:
+    """Start an Instagram feed stand-in and point ig_feed.feed at it."""
+    import ig_feed.feed as feed
+
+    stub = InstagramStub(stub_config, posts=BENCH_POSTS).start()
+    monkeypatch.setattr(feed, "GRAPH_URL", stub.url)
+    monkeypatch.setattr(feed, "MAX_POSTS", max(BENCH_POSTS, feed.MAX_POSTS))
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture(autouse=True)
+def fast_upstreams(monkeypatch) -> None:
+    """Reset upstream clients so each benchmark starts from a closed circuit.
+
+    Backoff is shortened to keep error-rate runs short, and client-side rate
+    limiting is disabled unless BENCH_RATE_LIMIT=1 so the numbers reflect
+    the sync pipeline rather than the configured token bucket.
+    """
+    import core.outscraper_client as outscraper_client
+    import core.strapi_client as strapi_client
+    import ig_feed.feed as ig_feed_client
+    import ig_feed.media as ig_media_client
+
+    for upstream in (
+        outscraper_client.UPSTREAM,
+        strapi_client.UPSTREAM,
+        ig_feed_client.UPSTREAM,
+        ig_media_client.UPSTREAM,
+    ):
+        upstream.breaker.record_success()
+        monkeypatch.setattr(upstream, "backoff_seconds", 0.01)
+        monkeypatch.setattr(upstream, "max_backoff_seconds", 0.05)
+        if not BENCH_RATE_LIMIT:
+            monkeypatch.setattr(upstream.bucket, "rate_per_second", 0)
+
+
+@pytest.fixture
+def record_benchmark() -> Callable[..., None]:
+    """Append one named measurement to the JSON report."""
+
+    def record(name: str, **fields: Any) -> None:
+        _RESULTS.append({"name": name, **fields})
+
+    return record
+
+
+@pytest.fixture
+def run_benchmark(record_benchmark) -> Callable[..., Any]:
+    """Run fn once, measuring wall time, span latencies and peak memory.
+
+    `count_items(result)` returns the number of items processed, used for
+    the throughput figure. The measurement is appended to the JSON report
+    and fn's result is returned.
+    """
+
+    def run(
+        name: str,
+        fn: Callable[[], Any],
+        count_items: Callable[[Any], int],
+        **details: Any,
+    ) -> Any:
+        spans: dict[str, list[float]] = {}
+
+        def hook(span: str, seconds: float, error: BaseException | None) -> None:
+            spans.setdefault(span, []).append(seconds)
+
+        before = resilience.snapshot()
+        metrics.add_span_hook(hook)
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = fn()
+        finally:
+            elapsed = time.perf_counter() - start
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            metrics.remove_span_hook(hook)
+
+        items = count_items(result)
+        upstreams = {}
+        for key, value in resilience.snapshot().items():
+            previous = before.get(key, {})
+            upstreams[key] = {
+                counter: round(value[counter] - previous.get(counter, 0), 3)
+                for counter in ("requests", "retries", "failures", "throttled_seconds")
+            }
+            upstreams[key]["circuit"] = value["circuit"]["state"]
+        record_benchmark(
+            name,
+            duration_seconds=round(elapsed, 4),
+            items=items,
+            throughput_per_second=round(items / elapsed, 2) if elapsed else None,
+            peak_memory_bytes=peak,
+            spans={span: _percentiles(samples) for span, samples in spans.items()},
+            upstreams=upstreams,
+            **details,
+        )
+        return result
+
+    return run
@@ -0,0 +1,361 @@
+"""Local stand-ins for the Outscraper, Strapi and Instagram HTTP APIs."""
+
+import hashlib
+import io
+import json
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import parse_qs, urlparse
+
+
+@dataclass
+class StubConfig:
+    """Behaviour knobs shared by the stub servers."""
+
+    latency_seconds: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 1234
+
+
+class _StubServer(ABC):
+    """Threaded HTTP server running in the background for one stub API."""
+
+    def __init__(self, config: StubConfig) -> None:
+        self.config = config
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        # (method, path) of every request, in arrival order
+        self.calls: list[tuple[str, str]] = []
+        self._lock = Lock()
+        self._random = random.Random(config.seed)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _dispatch(self, method: str) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, payload, *extra = stub.handle(
+                    method, urlparse(self.path), body, self.headers
+                )
+                headers = {"Content-Type": "application/json"}
+                headers.update(*extra)
+                if isinstance(payload, bytes):
+                    raw = payload
+                elif status == 304:
+                    raw = b""
+                else:
+                    raw = json.dumps(payload).encode()
+                with stub._lock:
+                    stub.bytes_sent += len(raw)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_PUT(self):
+                self._dispatch("PUT")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "_StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, method: str, url, body, headers) -> tuple:
+        if self.config.latency_seconds:
+            time.sleep(self.config.latency_seconds)
+        with self._lock:
+            self.requests += 1
+            self.calls.append((method, url.path))
+            failed = self._random.random() < self.config.error_rate
+            if failed:
+                self.errors += 1
+        if failed:
+            return 503, {"error": "stub upstream unavailable"}
+        return self.route(method, url, body, headers)
+
+    @abstractmethod
+    def route(self, method: str, url, body, headers) -> tuple:
+        """Return (status, payload) or (status, payload, headers).
+
+        A bytes payload is sent as-is, anything else as JSON.
+        """
+
+
+class OutscraperStub(_StubServer):
+    """Serves /maps/reviews-v3 and /requests/{id} with generated place data.
+
+    When `queued` is set, the first call returns a request id and the data
+    is only available after `polls_until_ready` calls to /requests/{id}.
+    """
+
+    def __init__(
+        self,
+        config: StubConfig,
+        reviews: int = 20,
+        queued: bool = False,
+        polls_until_ready: int = 1,
+    ) -> None:
+        super().__init__(config)
+        self.queued = queued
+        self.polls_until_ready = polls_until_ready
+        self._pending: dict[str, int] = {}
+        self._params: dict[str, dict] = {}
+        self.place = self._build_place(reviews)
+
+    @staticmethod
+    def _build_place(reviews: int) -> dict:
+        now = datetime.now(timezone.utc)
+        return {
+            "place_id": "stub-place",
+            "working_hours": {
+                "Monday": ["9AM-6PM"],
+                "Tuesday": ["9AM-6PM"],
+                "Saturday": ["Closed"],
+            },
+            "reviews_data": [
+                {
+                    "review_id": f"review-{i:08d}",
+                    "author_title": f"Author {i}",
+                    "review_rating": i % 5 + 1,
+                    "review_text": "Lorem ipsum dolor sit amet. " * 8,
+                    "review_link": f"https://example.invalid/review/{i}",
+                    "review_datetime_utc": (now - timedelta(minutes=i)).isoformat(),
+                }
+                for i in range(reviews)
+            ],
+        }
+
+    def _payload(self, params: dict) -> list:
+        limit = int(params.get("reviewsLimit", ["0"])[0] or 0)
+        cutoff = int(params.get("cutoff", ["0"])[0] or 0)
+        place = dict(self.place)
+        reviews = place["reviews_data"]
+        if cutoff:
+            reviews = [
+                review
+                for review in reviews
+                if datetime.fromisoformat(review["review_datetime_utc"]).timestamp()
+                > cutoff
+            ]
+        place["reviews_data"] = reviews[:limit] if limit else reviews
+        return [place]
+
+    def route(self, method: str, url, body, headers) -> tuple:
+        params = parse_qs(url.query)
+        if url.path == "/maps/reviews-v3":
+            if not self.queued:
+                return 200, {"status": "Success", "data": self._payload(params)}
+            with self._lock:
+                request_id = f"req-{len(self._pending)}"
+                self._pending[request_id] = 0
+                self._params[request_id] = params
+            return 202, {"id": request_id, "status": "Pending"}
+
+        if url.path.startswith("/requests/"):
+            request_id = url.path.rsplit("/", 1)[-1]
+            with self._lock:
+                self._pending[request_id] = self._pending.get(request_id, 0) + 1
+                ready = self._pending[request_id] >= self.polls_until_ready
+            if ready:
+                data = self._payload(self._params.get(request_id, {}))
+                return 200, {"status": "Success", "data": data}
+            return 200, {"status": "Pending"}
+
+        return 404, {"error": "not found"}
+
+
+class StrapiStub(_StubServer):
+    """In-memory /api/{collection} store with Strapi 5 style flat entries."""
+
+    UNIQUE_FIELDS = {
+        "reviews": "review_id",
+        "openinghours": "place_id",
+        "reviewaggregates": "place_id",
+        "igposts": "media_id",
+        "igmedias": "content_hash",
+    }
+
+    def __init__(self, config: StubConfig) -> None:
+        super().__init__(config)
+        self.collections: dict[str, dict[int, dict]] = {}
+        self._next_id = 1
+
+    def route(self, method: str, url, body, headers) -> tuple:
+        parts = url.path.strip("/").split("/")
+        if len(parts) < 2 or parts[0] != "api":
+            return 404, {"error": "not found"}
+        collection = parts[1]
+        entry_id = int(parts[2]) if len(parts) > 2 else None
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        with self._lock:
+            entries = self.collections.setdefault(collection, {})
+            if method == "GET" and entry_id is not None:
+                entry = entries.get(entry_id)
+                return (200, {"data": entry}) if entry else (404, {"data": None})
+            if method == "GET":
+                return 200, self._query(entries, params)
+            if method == "POST":
+                return self._create(collection, entries, body["data"])
+            if method == "PUT" and entry_id in entries:
+                entries[entry_id].update(body["data"])
+                entries[entry_id]["updatedAt"] = _now()
+                return 200, {"data": entries[entry_id]}
+        return 404, {"error": "not found"}
+
+    def _query(self, entries: dict[int, dict], params: dict) -> dict:
+        rows = list(entries.values())
+        for key, value in params.items():
+            if key.startswith("filters[") and key.endswith("[$eq]"):
+                field = key[len("filters[") : key.index("]")]
+                rows = [row for row in rows if str(row.get(field)) == value]
+        sort = params.get("sort")
+        if sort:
+            field, _, direction = sort.partition(":")
+            rows.sort(key=lambda row: row.get(field) or "", reverse=direction == "desc")
+        page = int(params.get("pagination[page]", 1))
+        page_size = int(params.get("pagination[pageSize]", 25))
+        start = (page - 1) * page_size
+        return {
+            "data": rows[start : start + page_size],
+            "meta": {
+                "pagination": {
+                    "page": page,
+                    "pageSize": page_size,
+                    "pageCount": -(-len(rows) // page_size),
+                    "total": len(rows),
+                }
+            },
+        }
+
+    def _create(
+        self, collection: str, entries: dict[int, dict], data: dict
+    ) -> tuple[int, dict]:
+        unique = self.UNIQUE_FIELDS.get(collection)
+        values = (row.get(unique) for row in entries.values())
+        if unique and data.get(unique) in values:
+            return 400, {"error": {"message": f"{unique} must be unique"}}
+        entry = {"id": self._next_id, **data, "createdAt": _now(), "updatedAt": _now()}
+        entries[self._next_id] = entry
+        self._next_id += 1
+        return 201, {"data": entry}
+
+
+class InstagramStub(_StubServer):
+    """Serves a Graph API style /me/media feed and JPEG media files.
+
+    Posts are newest first and paged with `after` cursors. The first page
+    and every media file carry an ETag and answer If-None-Match with 304.
+    Only `distinct_images` different images exist, so media repeats across
+    posts the way reposted pictures do.
+    """
+
+    def __init__(
+        self, config: StubConfig, posts: int = 20, distinct_images: int = 5
+    ) -> None:
+        super().__init__(config)
+        self.images = [_jpeg(i) for i in range(max(1, distinct_images))]
+        self.posts: list[dict] = []
+        self.media_requests = 0
+        self.add_posts(posts)
+
+    def add_posts(self, count: int) -> None:
+        """Publish count new posts on top of the feed."""
+        with self._lock:
+            start = len(self.posts)
+            now = datetime.now(timezone.utc)
+            for i in range(start, start + count):
+                post = {
+                    "id": str(17_900_000_000_000_000 + i),
+                    "caption": f"Post {i}",
+                    "media_type": "VIDEO" if i % 7 == 6 else "IMAGE",
+                    "permalink": f"https://example.invalid/p/{i}/",
+                    "timestamp": (now + timedelta(seconds=i)).strftime(
+                        "%Y-%m-%dT%H:%M:%S+0000"
+                    ),
+                }
+                key = "thumbnail_url" if post["media_type"] == "VIDEO" else "media_url"
+                post[key] = f"{self.url}/media/{i % len(self.images)}.jpg?sig={i}"
+                self.posts.insert(0, post)
+
+    def route(self, method: str, url, body, headers) -> tuple:
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path.endswith("/media") and method == "GET":
+            return self._feed(params, headers)
+        if url.path.startswith("/media/"):
+            index = int(url.path.rsplit("/", 1)[-1].split(".")[0])
+            with self._lock:
+                self.media_requests += 1
+            content = self.images[index]
+            etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+            validators = {
+                "ETag": etag,
+                "Last-Modified": format_datetime(
+                    datetime(2024, 1, 1, tzinfo=timezone.utc), usegmt=True
+                ),
+            }
+            if headers.get("If-None-Match") == etag:
+                return 304, None, validators
+            return 200, content, {"Content-Type": "image/jpeg", **validators}
+        return 404, {"error": "not found"}
+
+    def _feed(self, params: dict, headers) -> tuple:
+        limit = int(params.get("limit", 25))
+        start = int(params.get("after", 0))
+        with self._lock:
+            page = self.posts[start : start + limit]
+            more = start + limit < len(self.posts)
+        payload: dict = {"data": page, "paging": {}}
+        if more:
+            payload["paging"]["next"] = (
+                f"{self.url}/me/media?limit={limit}&after={start + limit}"
+            )
+        if start:
+            return 200, payload
+        etag = f'"{hashlib.sha256(json.dumps(page).encode()).hexdigest()[:16]}"'
+        if headers.get("If-None-Match") == etag:
+            return 304, None, {"ETag": etag}
+        return 200, payload, {"ETag": etag}
+
+
+def _jpeg(seed: int) -> bytes:
+    from PIL import Image
+
+    rng = random.Random(seed)
+    image = Image.new("RGB", (1080, 1080), tuple(rng.randrange(256) for _ in range(3)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
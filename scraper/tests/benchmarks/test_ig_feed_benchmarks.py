@@ -0,0 +1,142 @@
+"""Instagram feed sync benchmarks against local feed and Strapi stubs."""
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+NEW_POSTS = 5
+
+
+@pytest.fixture
+def feed_sync(instagram_stub, strapi_stub, monkeypatch):
+    import ig_feed.main as feed_main
+    import ig_feed.strapi as feed_strapi
+
+    monkeypatch.setattr(feed_main, "_cache", None)
+    monkeypatch.setattr(feed_strapi, "_KNOWN_HASHES", set())
+    return feed_main._sync_feed
+
+
+def test_ig_feed_sync_full(
+    feed_sync, instagram_stub, strapi_stub, bench_posts, run_benchmark
+):
+    result = run_benchmark(
+        "ig_feed_sync_full", feed_sync, lambda r: r["fetched_posts"]
+    )
+
+    assert result["success"], result["error"]
+    assert result["stored_posts"] == bench_posts
+    # One thumbnail per distinct image, however often it was posted.
+    assert len(strapi_stub.collections["igmedias"]) == len(instagram_stub.images)
+    thumbnail = next(iter(strapi_stub.collections["igmedias"].values()))
+    assert thumbnail["thumbnail"].startswith("data:image/webp;base64,")
+    assert len(thumbnail["thumbnail"]) < len(instagram_stub.images[0])
+
+
+def test_ig_feed_sync_unchanged(
+    feed_sync, instagram_stub, run_benchmark
+):
+    feed_sync()
+    # Injected 503s are retried, so count only the requests that got through.
+    answered_before = instagram_stub.requests - instagram_stub.errors
+
+    result = run_benchmark(
+        "ig_feed_sync_unchanged", feed_sync, lambda r: r["fetched_posts"]
+    )
+
+    assert result["success"], result["error"]
+    assert result["feed_not_modified"]
+    answered = instagram_stub.requests - instagram_stub.errors
+    assert answered - answered_before == 1
+
+
+def test_ig_feed_sync_incremental(
+    feed_sync, instagram_stub, run_benchmark
+):
+    feed_sync()
+    instagram_stub.add_posts(NEW_POSTS)
+    media_before = instagram_stub.media_requests
+    bytes_before = instagram_stub.bytes_sent
+
+    result = run_benchmark(
+        "ig_feed_sync_incremental",
+        feed_sync,
+        lambda r: r["fetched_posts"],
+        new_posts=NEW_POSTS,
+    )
+
+    assert result["success"], result["error"]
+    assert result["stored_posts"] == NEW_POSTS
+    assert instagram_stub.media_requests - media_before == NEW_POSTS
+    # Volume tracks the new posts: one feed page plus their media.
+    largest_image = max(len(image) for image in instagram_stub.images)
+    sent = instagram_stub.bytes_sent - bytes_before
+    assert sent < (NEW_POSTS + 1) * largest_image + 64 * 1024
+
+
+def test_ig_feed_resync_reuses_media_validators(
+    feed_sync, instagram_stub, strapi_stub, bench_posts, run_benchmark
+):
+    feed_sync()
+    strapi_stub.collections["igposts"].clear()
+    bytes_before = instagram_stub.bytes_sent
+
+    result = run_benchmark(
+        "ig_feed_resync_not_modified", feed_sync, lambda r: r["fetched_posts"]
+    )
+
+    assert result["success"], result["error"]
+    assert not result["feed_not_modified"]
+    assert result["stored_posts"] == bench_posts
+    assert result["not_modified_media"] == bench_posts
+    assert result["downloaded_bytes"] == 0
+    assert instagram_stub.bytes_sent - bytes_before < min(
+        len(image) for image in instagram_stub.images
+    )
+
+
+def test_ig_feed_sync_keeps_post_from_watermark_second(
+    feed_sync, instagram_stub, strapi_stub, no_errors
+):
+    feed_sync()
+    instagram_stub.add_posts(1)
+    # Published in the same second as the newest stored post.
+    instagram_stub.posts[0]["timestamp"] = instagram_stub.posts[1]["timestamp"]
+
+    result = feed_sync()
+
+    assert result["success"], result["error"]
+    assert (result["stored_posts"], result["skipped_posts"]) == (1, 0)
+    stored = {post["media_id"] for post in strapi_stub.collections["igposts"].values()}
+    assert instagram_stub.posts[0]["id"] in stored
+
+
+def test_ig_feed_sync_fetches_every_post_since_watermark(
+    feed_sync, instagram_stub, strapi_stub, no_errors, monkeypatch
+):
+    import ig_feed.feed as feed
+
+    feed_sync()
+    monkeypatch.setattr(feed, "MAX_POSTS", 10)
+    instagram_stub.add_posts(feed.MAX_POSTS + 15)
+
+    result = feed_sync()
+
+    assert result["success"], result["error"]
+    assert result["stored_posts"] == feed.MAX_POSTS + 15
+    stored = {post["media_id"] for post in strapi_stub.collections["igposts"].values()}
+    assert {post["id"] for post in instagram_stub.posts} <= stored
+
+
+def test_ig_feed_first_sync_reports_max_posts_cap(
+    feed_sync, instagram_stub, bench_posts, no_errors, monkeypatch, capsys
+):
+    import ig_feed.feed as feed
+
+    monkeypatch.setattr(feed, "MAX_POSTS", bench_posts // 2)
+
+    result = feed_sync()
+
+    assert result["success"], result["error"]
+    assert result["stored_posts"] == bench_posts // 2
+    assert f"keeps the newest {bench_posts // 2} posts" in capsys.readouterr().out
@@ -0,0 +1,77 @@
+"""Cold-start import benchmarks measured with `python -X importtime`."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+SOURCE_DIRS = (
+    "core/src",
+    "google_business_review/src",
+    "google_business_opening_hours/src",
+    "ig_feed/src",
+    "google_business_sync/src",
+)
+# Modules only a running API (or, for PIL, a thumbnail) needs; importing a
+# service for a one-shot sync must not pull them in.
+SERVER_MODULES = ("fastapi", "apscheduler", "uvicorn", "pydantic", "PIL")
+# Modules only a sync run needs, for upstream calls and run metrics.
+RUN_MODULES = ("requests", "prometheus_client")
+
+
+def _import_profile(module: str) -> tuple[int, set[str]]:
+    """Return (cumulative import microseconds, imported module names)."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(PROJECT_DIR / path) for path in SOURCE_DIRS]
+        + [env.get("PYTHONPATH", "")]
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    cumulative = 0
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative = int(cumulative_us)
+    return cumulative, imported
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "google_business_review.main",
+        "google_business_opening_hours.main",
+        "ig_feed.main",
+        "google_business_sync.main",
+    ],
+)
+def test_service_import_is_lazy(module, record_benchmark):
+    cumulative_us, imported = _import_profile(module)
+
+    record_benchmark(
+        f"import:{module}",
+        import_ms=round(cumulative_us / 1000, 3),
+        modules_imported=len(imported),
+    )
+    loaded = {name.split(".")[0] for name in imported} & {
+        *SERVER_MODULES,
+        *RUN_MODULES,
+    }
+    assert not loaded, f"{module} eagerly imports {sorted(loaded)}"
@@ -0,0 +1,197 @@
+"""End-to-end sync benchmarks against local Outscraper and Strapi stubs."""
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture
+def review_sync(outscraper_stub, strapi_stub, bench_reviews, monkeypatch):
+    import google_business_review.main as review_main
+    import google_business_review.outscraper as review_outscraper
+
+    monkeypatch.setattr(review_outscraper, "REVIEWS_LIMIT", bench_reviews)
+    return review_main._sync_reviews
+
+
+@pytest.fixture
+def opening_hours_sync(outscraper_stub, strapi_stub, monkeypatch):
+    import google_business_opening_hours.main as opening_hours_main
+    import google_business_opening_hours.strapi as opening_hours_strapi
+
+    monkeypatch.setattr(opening_hours_strapi, "_ENTRY_IDS", {})
+    return opening_hours_main._sync_opening_hours
+
+
+def _written(result: dict) -> int:
+    return result["stored_reviews"] + result["skipped_reviews"]
+
+
+def _stored_aggregate(strapi_stub) -> dict:
+    (aggregate,) = strapi_stub.collections["reviewaggregates"].values()
+    return aggregate
+
+
+def _expected_totals(reviews: list[dict]) -> tuple[int, float]:
+    """Return (review_count, average_rating) of raw Outscraper reviews."""
+    ratings = [review["review_rating"] for review in reviews]
+    return len(ratings), round(sum(ratings) / len(ratings), 3)
+
+
+def test_review_sync_full(review_sync, strapi_stub, run_benchmark):
+    result = run_benchmark("review_sync_full", review_sync, _written)
+
+    assert result["success"], result["error"]
+    assert len(strapi_stub.collections["reviews"]) == result["stored_reviews"]
+
+
+def test_review_sync_incremental(review_sync, run_benchmark):
+    review_sync()
+
+    result = run_benchmark(
+        "review_sync_incremental", review_sync, lambda r: r["fetched_reviews"]
+    )
+
+    assert result["success"], result["error"]
+
+
+def test_review_sync_queued(
+    review_sync, outscraper_stub, run_benchmark
+):
+    outscraper_stub.queued = True
+    outscraper_stub.polls_until_ready = 3
+
+    result = run_benchmark(
+        "review_sync_queued", review_sync, _written, polls_until_ready=3
+    )
+
+    assert result["success"], result["error"]
+
+
+def test_review_sync_outage(
+    review_sync, outscraper_stub, strapi_stub, stub_config, run_benchmark
+):
+    stub_config.error_rate = 1.0
+
+    result = run_benchmark("review_sync_outage", review_sync, _written)
+
+    assert not result["success"]
+    assert result["status"] == "error"
+    assert result["error"]
+    assert not strapi_stub.collections.get("reviews")
+
+
+def test_review_aggregate_incremental_matches_recompute(
+    review_sync,
+    outscraper_stub,
+    strapi_stub,
+    no_errors,
+    run_benchmark,
+    monkeypatch,
+):
+    import google_business_review.aggregates as aggregates
+    import google_business_review.strapi as review_strapi
+
+    # Reviews are newest first. The first run creates the aggregate from the
+    # oldest half; the second refetches everything from the third quarter on,
+    # skips the stored reviews and folds the new ones in incrementally.
+    monkeypatch.setattr(review_strapi, "get_review_cutoff_unix", lambda: 0)
+    reviews = outscraper_stub.place["reviews_data"]
+    half, quarter = len(reviews) // 2, len(reviews) // 4
+    outscraper_stub.place["reviews_data"] = reviews[half:]
+    first = review_sync()
+    assert first["aggregate_status"] == "recomputed", first["error"]
+    outscraper_stub.place["reviews_data"] = reviews[quarter:]
+    second = review_sync()
+    assert second["aggregate_status"] == "updated", second["error"]
+    assert second["stored_reviews"] == half - quarter
+    aggregate = _stored_aggregate(strapi_stub)
+    assert (aggregate["review_count"], aggregate["average_rating"]) == (
+        _expected_totals(reviews[quarter:])
+    )
+
+    # The newest quarter is stored, then folded in as one measured update.
+    new_reviews = [review_strapi.review_data(review) for review in reviews[:quarter]]
+    for data in new_reviews:
+        assert review_strapi.store_review(data) == "stored"
+    status = run_benchmark(
+        "review_aggregate_update",
+        lambda: aggregates.apply_new_reviews(new_reviews),
+        lambda r: len(new_reviews),
+    )
+    assert status == "updated"
+    incremental = dict(_stored_aggregate(strapi_stub))
+
+    recomputed = run_benchmark(
+        "review_aggregate_recompute",
+        aggregates.recompute,
+        lambda r: r["review_count"],
+    )
+
+    assert (recomputed["review_count"], recomputed["average_rating"]) == (
+        _expected_totals(reviews)
+    )
+    assert {key: incremental[key] for key in recomputed} == recomputed
+
+
+def test_review_aggregate_recomputes_missed_reviews(
+    review_sync, outscraper_stub, strapi_stub, no_errors
+):
+    import google_business_review.strapi as review_strapi
+
+    reviews = outscraper_stub.place["reviews_data"]
+    outscraper_stub.place["reviews_data"] = reviews[1:]
+    review_sync()
+    # Stored without updating the aggregate, as by a run whose aggregate
+    # write failed before a restart.
+    assert review_strapi.store_review(review_strapi.review_data(reviews[0])) == (
+        "stored"
+    )
+
+    result = review_sync()
+
+    assert result["aggregate_status"] == "recomputed", result["error"]
+    aggregate = _stored_aggregate(strapi_stub)
+    assert (aggregate["review_count"], aggregate["average_rating"]) == (
+        _expected_totals(reviews)
+    )
+    assert review_sync()["aggregate_status"] == "unchanged"
+
+
+def test_opening_hours_sync(opening_hours_sync, run_benchmark):
+    first = run_benchmark("opening_hours_sync_create", opening_hours_sync, lambda r: 1)
+    second = run_benchmark(
+        "opening_hours_sync_unchanged", opening_hours_sync, lambda r: 1
+    )
+
+    assert first["success"], first["error"]
+    assert second["success"], second["error"]
+    assert first["outcome"] == "stored"
+    assert second["outcome"] == "unchanged"
+
+
+def test_opening_hours_sync_updates_cached_entry(
+    opening_hours_sync, outscraper_stub, strapi_stub, no_errors
+):
+    import google_business_opening_hours.strapi as opening_hours_strapi
+
+    assert opening_hours_sync()["outcome"] == "stored"
+    (entry_id,) = strapi_stub.collections["openinghours"]
+    assert opening_hours_strapi._ENTRY_IDS == {
+        opening_hours_strapi.PLACE_ID: entry_id
+    }
+    hours = {**outscraper_stub.place["working_hours"], "Saturday": ["10AM-2PM"]}
+    outscraper_stub.place["working_hours"] = hours
+    calls_before = len(strapi_stub.calls)
+
+    result = opening_hours_sync()
+
+    assert result["outcome"] == "updated", result["error"]
+    calls = strapi_stub.calls[calls_before:]
+    # The cached id is read and written directly, without a filtered lookup.
+    assert calls == [
+        ("GET", f"/api/openinghours/{entry_id}"),
+        ("PUT", f"/api/openinghours/{entry_id}"),
+    ]
+    (entry,) = strapi_stub.collections["openinghours"].values()
+    assert entry["opening_hours"]["Saturday"] == ["10AM-2PM"]
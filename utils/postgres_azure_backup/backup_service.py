@@ -1,15 +1,45 @@
-"""PostgreSQL backup service with Azure Storage integration."""
+"""PostgreSQL backup service with Azure Storage integration.
 
+Integrity data is computed while the data streams through, never in an extra
+pass: the SHA-256 of the dump while pg_dump writes it, and a CRC64 per block
+while it is uploaded. Azure validates every block checksum on receipt, and the
+SHA-256 is stored as blob metadata and in a `<blob>.manifest.json` blob that
+`python backup_service.py verify <blob>` checks against. The blobs of one
+backup are listed in restore order in a `<backup>.set.json` set manifest that
+is marked complete only after the last of them was uploaded.
+
+The load on the live database is bounded by ImpactOptions: dump from a read
+replica, run pg_dump under nice/ionice, cap dump and upload bandwidth, and
+exclude large tables' data or defer it to data-only dumps taken in parallel
+from one exported snapshot.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
 import logging
 import os
+import re
+import shutil
 import subprocess
 import tempfile
+import threading
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Sequence
 
-from azure.storage.blob import BlobClient, ContainerClient, StandardBlobTier
+from azure.storage.blob import (
+    BlobBlock,
+    BlobClient,
+    ContainerClient,
+    ContentSettings,
+    StandardBlobTier,
+)
 from dotenv import load_dotenv
 
 # Configure logging - only errors and key metrics
@@ -58,13 +88,165 @@ def load_environment() -> dict:
     return config
 
 
+DUMP_TIMEOUT_SECONDS = 3600
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024
+# Computed by the SDK with azure-storage-blob[ext-checksums] and sent with
+# every block; Azure rejects the block on mismatch.
+BLOCK_VALIDATION = "crc64"
+
+
+def _env_list(name: str) -> tuple[str, ...]:
+    return tuple(item.strip() for item in os.getenv(name, '').split(',') if item.strip())
+
+
+@dataclass(frozen=True)
+class ImpactOptions:
+    """Settings that bound the load a backup puts on the live database.
+
+    Read from the environment by `from_env`; the defaults keep the previous
+    behaviour (primary host, full speed, everything in one dump).
+    """
+
+    replica_host: Optional[str] = None
+    replica_port: Optional[str] = None
+    nice: int = 0
+    ionice_class: Optional[int] = None
+    dump_max_bytes_per_second: float = 0
+    upload_max_bytes_per_second: float = 0
+    exclude_tables: tuple[str, ...] = ()
+    defer_tables: tuple[str, ...] = ()
+    parallel_workers: int = 2
+
+    @classmethod
+    def from_env(cls) -> "ImpactOptions":
+        """Build options from BACKUP_* and DATABASE_REPLICA_* variables."""
+        ionice_class = os.getenv('BACKUP_IONICE_CLASS')
+        return cls(
+            replica_host=os.getenv('DATABASE_REPLICA_HOST') or None,
+            replica_port=os.getenv('DATABASE_REPLICA_PORT') or None,
+            nice=int(os.getenv('BACKUP_NICE', '0')),
+            ionice_class=int(ionice_class) if ionice_class else None,
+            dump_max_bytes_per_second=float(os.getenv('BACKUP_DUMP_MAX_MBPS', '0')) * 1024 * 1024,
+            upload_max_bytes_per_second=(
+                float(os.getenv('BACKUP_UPLOAD_MAX_MBPS', '0')) * 1024 * 1024
+            ),
+            exclude_tables=_env_list('BACKUP_EXCLUDE_TABLES'),
+            defer_tables=_env_list('BACKUP_DEFER_TABLES'),
+            parallel_workers=max(1, int(os.getenv('BACKUP_PARALLEL_WORKERS', '2'))),
+        )
+
+    def priority_prefix(self) -> list[str]:
+        """Return the nice/ionice command prefix for pg_dump, if configured."""
+        prefix = []
+        if self.ionice_class is not None and shutil.which('ionice'):
+            prefix += ['ionice', '-c', str(self.ionice_class)]
+            if self.ionice_class == 2:
+                prefix += ['-n', '7']
+        if self.nice and shutil.which('nice'):
+            prefix += ['nice', '-n', str(self.nice)]
+        return prefix
+
+
+class Throttle:
+    """Paces byte streams to at most `bytes_per_second` combined (0 = unlimited).
+
+    One throttle can be shared by parallel workers; each chunk waits for the
+    time slot the previous chunks reserved.
+    """
+
+    def __init__(self, bytes_per_second: float = 0) -> None:
+        self.bytes_per_second = bytes_per_second
+        self._next_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size: int) -> None:
+        """Wait until size more bytes fit under the rate."""
+        if self.bytes_per_second <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next_at, now)
+            self._next_at = start + size / self.bytes_per_second
+        if start > now:
+            time.sleep(start - now)
+
+
+@contextmanager
+def exported_snapshot(
+    database_host: str,
+    database_port: str,
+    database_name: str,
+    database_username: str,
+    database_password: str,
+) -> Iterator[str]:
+    """Export a snapshot and keep it alive for the duration of the block.
+
+    Every pg_dump started with `--snapshot=<id>` inside the block sees the
+    same consistent view of the database.
+
+    Yields:
+        The snapshot id returned by pg_export_snapshot()
+    """
+    import psycopg2
+
+    conn = psycopg2.connect(
+        host=database_host,
+        port=database_port,
+        dbname=database_name,
+        user=database_username,
+        password=database_password,
+    )
+    try:
+        conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_export_snapshot()")
+            snapshot = cursor.fetchone()[0]
+        info_logger.info(f"Exported snapshot {snapshot}")
+        yield snapshot
+    finally:
+        conn.close()
+
+
+def checksum_path(backup_path: Path) -> Path:
+    """Return the path of the sha256sum-style file written next to a backup."""
+    return backup_path.with_name(f"{backup_path.name}.sha256")
+
+
+def manifest_blob_name(blob_name: str) -> str:
+    """Return the name of the manifest blob stored next to a backup blob."""
+    return f"{blob_name}.manifest.json"
+
+
+SET_MANIFEST_SUFFIX = ".set.json"
+
+
+def set_manifest_name(blob_name: str) -> str:
+    """Return the name of the set manifest of a backup whose first blob is blob_name."""
+    return f"{Path(blob_name).stem}{SET_MANIFEST_SUFFIX}"
+
+
+def read_checksum(backup_path: Path) -> Optional[str]:
+    """Return the SHA-256 recorded for a backup file, if any."""
+    try:
+        return checksum_path(backup_path).read_text(encoding="utf-8").split()[0]
+    except (OSError, IndexError):
+        return None
+
+
 def create_backup(
     database_host: str,
     database_port: str,
     database_name: str,
     database_username: str,
     database_password: str,
-    backup_dir: Optional[str] = None
+    backup_dir: Optional[str] = None,
+    extra_args: Sequence[str] = (),
+    label: str = "",
+    timestamp: Optional[str] = None,
+    snapshot: Optional[str] = None,
+    options: Optional[ImpactOptions] = None,
+    throttle: Optional[Throttle] = None,
 ) -> Path:
     """Create a PostgreSQL backup using pg_dump.
     
@@ -75,9 +257,16 @@ def create_backup(
         database_username: Database username
         database_password: Database password
         backup_dir: Directory to store the backup
+        extra_args: Additional pg_dump arguments (table selection, data-only, ...)
+        label: Suffix for the backup filename, e.g. `_data_public.events`
+        timestamp: Timestamp for the filename, shared by the parts of one backup
+        snapshot: Exported snapshot id for pg_dump --snapshot
+        options: Niceness settings applied to the pg_dump process
+        throttle: Caps the rate at which the dump is read from pg_dump
         
     Returns:
-        Path to the backup file
+        Path to the backup file. Its SHA-256, computed while pg_dump wrote
+        it, is stored next to it in `<file>.sha256`.
         
     Raises:
         RuntimeError: If backup creation fails
@@ -85,8 +274,9 @@ def create_backup(
     if backup_dir is None:
         backup_dir = tempfile.gettempdir()
     
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"backup_{database_name}_{timestamp}.sql"
+    if timestamp is None:
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    backup_filename = f"backup_{database_name}_{timestamp}{label}.sql"
     backup_path = Path(backup_dir) / backup_filename
     
     info_logger.info(f"Backup started: {backup_filename}")
@@ -103,22 +293,60 @@ def create_backup(
             '-U', database_username,
             '-d', database_name,
             '-F', 'plain',
+            *extra_args,
         ]
+        if snapshot:
+            cmd.append(f'--snapshot={snapshot}')
+        if options is not None:
+            cmd = options.priority_prefix() + cmd
+        throttle = throttle or Throttle()
         
-        with open(backup_path, 'w') as f:
-            subprocess.run(
-                cmd,
-                stdout=f,
-                stderr=subprocess.PIPE,
-                env=env,
-                check=True,
-                text=True,
-                timeout=3600
-            )
+        # Hash the dump while it is written instead of re-reading it later
+        sha256 = hashlib.sha256()
+        with open(backup_path, 'wb') as f, tempfile.TemporaryFile() as stderr:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, env=env)
+            timed_out = threading.Event()
+
+            def kill_on_timeout() -> None:
+                timed_out.set()
+                proc.kill()
+
+            timer = threading.Timer(DUMP_TIMEOUT_SECONDS, kill_on_timeout)
+            timer.start()
+            try:
+                # Throttling the reads back-pressures pg_dump through the pipe
+                for chunk in iter(lambda: proc.stdout.read(CHUNK_SIZE), b''):
+                    throttle.consume(len(chunk))
+                    f.write(chunk)
+                    sha256.update(chunk)
+                proc.stdout.close()
+                returncode = proc.wait()
+            except BaseException:
+                proc.kill()
+                proc.wait()
+                raise
+            finally:
+                timer.cancel()
+
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(cmd, DUMP_TIMEOUT_SECONDS)
+            if returncode != 0:
+                stderr.seek(0)
+                raise subprocess.CalledProcessError(
+                    returncode, cmd, stderr=stderr.read().decode(errors='replace')
+                )
+
+        digest = sha256.hexdigest()
+        checksum_path(backup_path).write_text(
+            f"{digest}  {backup_filename}\n", encoding="utf-8"
+        )
         
         elapsed_time = time.time() - start_time
         file_size_mb = backup_path.stat().st_size / (1024*1024)
-        info_logger.info(f"Backup completed: {backup_filename} ({file_size_mb:.2f}MB, {elapsed_time:.2f}s)")
+        info_logger.info(
+            f"Backup completed: {backup_filename} ({file_size_mb:.2f}MB, {elapsed_time:.2f}s, "
+            f"sha256={digest})"
+        )
         
         return backup_path
         
@@ -145,26 +373,41 @@ def create_backup(
 def upload_to_azure(
     backup_path: Path,
     connection_string: str,
-    container_name: str = "backups"
+    container_name: str = "backups",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    blob_tier: StandardBlobTier = StandardBlobTier.ARCHIVE,
+    max_bytes_per_second: float = 0,
+    backup_set: Optional[str] = None,
 ) -> Optional[str]:
     """Upload backup file to Azure Blob Storage.
     
+    The file is staged in blocks, each sent with its CRC64 so Azure validates
+    it on receipt, and the committed block list is checked before the blob
+    is moved to the Archive tier. The SHA-256 is computed over the same reads and
+    compared with the one recorded by create_backup, then stored as blob
+    metadata and in a manifest blob together with the block list.
+
     Args:
         backup_path: Path to the backup file
         connection_string: Azure Storage connection string
         container_name: Name of the blob container
+        block_size: Size of each staged block in bytes
+        blob_tier: Access tier set when the block list is committed
+        max_bytes_per_second: Upload bandwidth cap (0 = unlimited)
+        backup_set: Name of the set manifest the blob belongs to, if any
         
     Returns:
         Name of the uploaded blob
         
     Raises:
-        RuntimeError: If upload fails
+        RuntimeError: If upload fails or the file no longer matches its checksum
     """
     if not backup_path.exists():
         raise FileNotFoundError(f"Backup file not found: {backup_path}")
     
     blob_name = backup_path.name
     file_size = backup_path.stat().st_size
+    expected_sha256 = read_checksum(backup_path)
     
     info_logger.info(f"Upload started: {blob_name}")
     start_time = time.time()
@@ -183,41 +426,501 @@ def upload_to_azure(
             # Container already exists, which is fine
             pass
         
+        blob_client = BlobClient.from_connection_string(
+            connection_string,
+            container_name=container_name,
+            blob_name=blob_name
+        )
+
+        sha256 = hashlib.sha256()
+        blocks = []
+        throttle = Throttle(max_bytes_per_second)
         with open(backup_path, 'rb') as data:
-            blob_client = BlobClient.from_connection_string(
-                connection_string,
-                container_name=container_name,
-                blob_name=blob_name
+            for chunk in iter(lambda: data.read(block_size), b''):
+                throttle.consume(len(chunk))
+                block_id = f"{len(blocks):08d}"
+                sha256.update(chunk)
+                response = blob_client.stage_block(
+                    block_id, chunk, validate_content=BLOCK_VALIDATION
+                )
+                crc64 = base64.b64encode(response["content_crc64"]).decode("ascii")
+                blocks.append({"id": block_id, "size": len(chunk), "crc64": crc64})
+
+        digest = sha256.hexdigest()
+        if expected_sha256 and digest != expected_sha256:
+            raise RuntimeError(
+                f"Checksum mismatch for {blob_name}: dump sha256={expected_sha256}, "
+                f"uploaded sha256={digest}"
             )
-            
-            blob_client.upload_blob(data, overwrite=True)
+
+        manifest_name = manifest_blob_name(blob_name)
+        metadata = {
+            "sha256": digest,
+            "size": str(file_size),
+            "blocks": str(len(blocks)),
+            "manifest": manifest_name,
+        }
+        if backup_set:
+            metadata["backup_set"] = backup_set
+        # Archived blobs refuse Get Block List, so commit to the account's
+        # default tier, check the committed blocks, then archive.
+        archive = blob_tier == StandardBlobTier.ARCHIVE
+        blob_client.commit_block_list(
+            [BlobBlock(block_id=block["id"]) for block in blocks],
+            metadata=metadata,
+            standard_blob_tier=None if archive else blob_tier,
+        )
+        committed, _uncommitted = blob_client.get_block_list("committed")
+        problem = _block_list_problem(committed, blocks)
+        if problem:
+            raise RuntimeError(f"Committed {blob_name} does not match the upload: {problem}")
+        if archive:
             blob_client.set_standard_blob_tier(StandardBlobTier.ARCHIVE)
-            
-            elapsed_time = time.time() - start_time
-            info_logger.info(
-                f"Upload completed: {blob_name} ({file_size / (1024*1024):.2f}MB, {elapsed_time:.2f}s)"
-            )
-            
-            return blob_name
+
+        manifest = {
+            "blob": blob_name,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "size": file_size,
+            "sha256": digest,
+            "block_size": block_size,
+            "blocks": blocks,
+            "backup_set": backup_set,
+        }
+        container_client.upload_blob(
+            manifest_name,
+            json.dumps(manifest, indent=2),
+            overwrite=True,
+            content_settings=ContentSettings(content_type="application/json"),
+        )
+
+        elapsed_time = time.time() - start_time
+        info_logger.info(
+            f"Upload completed: {blob_name} ({file_size / (1024*1024):.2f}MB, {elapsed_time:.2f}s, "
+            f"{len(blocks)} blocks verified by Azure)"
+        )
+
+        return blob_name
             
     except Exception as e:
         logger.error(f"Upload to Azure failed: {e}")
         raise RuntimeError(f"Upload to Azure failed: {e}") from e
 
 
+def upload_set_manifest(
+    set_name: str,
+    blob_names: Sequence[str],
+    connection_string: str,
+    container_name: str = "backups",
+    complete: bool = False,
+) -> None:
+    """Write the manifest listing the blobs of one backup in restore order.
+
+    It is written with complete=False before the first blob is uploaded and
+    rewritten with complete=True after the last one, so verify rejects a set
+    whose upload was interrupted.
+
+    Args:
+        set_name: Name of the set manifest blob
+        blob_names: Backup blobs in the order they must be restored
+        connection_string: Azure Storage connection string
+        container_name: Name of the blob container
+        complete: Whether every blob of the set has been uploaded
+
+    Raises:
+        RuntimeError: If the upload fails
+    """
+    container_client = ContainerClient.from_connection_string(
+        connection_string,
+        container_name=container_name
+    )
+    try:
+        container_client.create_container()
+    except Exception:
+        # Container already exists, which is fine
+        pass
+
+    backup_set = {
+        "backup_set": set_name,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "blobs": list(blob_names),
+        "complete": complete,
+    }
+    try:
+        container_client.upload_blob(
+            set_name,
+            json.dumps(backup_set, indent=2),
+            overwrite=True,
+            content_settings=ContentSettings(content_type="application/json"),
+        )
+    except Exception as e:
+        logger.error(f"Upload of set manifest {set_name} failed: {e}")
+        raise RuntimeError(f"Upload of set manifest {set_name} failed: {e}") from e
+
+
+def _block_list_problem(committed: list, blocks: list[dict]) -> Optional[str]:
+    """Describe how a committed block list differs from the manifest blocks, if it does."""
+    committed_blocks = [(block.id, block.size) for block in committed]
+    manifest_blocks = [(block["id"], block["size"]) for block in blocks]
+    if committed_blocks == manifest_blocks:
+        return None
+    return (
+        f"committed block list ({len(committed_blocks)} blocks) does not match "
+        f"manifest ({len(manifest_blocks)} blocks)"
+    )
+
+
+def _load_set_manifest(container_client: ContainerClient, set_name: str) -> dict:
+    """Download a set manifest and reject it unless it is marked complete."""
+    try:
+        backup_set = json.loads(container_client.download_blob(set_name).readall())
+    except Exception as e:
+        raise RuntimeError(f"Set manifest {set_name} could not be read: {e}") from e
+    if backup_set.get("complete") is not True:
+        raise RuntimeError(
+            f"Backup set {set_name} is incomplete; its upload did not finish"
+        )
+    return backup_set
+
+
+def _check_blob(container_client: ContainerClient, blob_name: str) -> tuple:
+    """Check one backup blob against its manifest without reading its data.
+
+    Returns:
+        (blob client, properties, manifest, report, problems)
+    """
+    blob_client = container_client.get_blob_client(blob_name)
+    try:
+        manifest = json.loads(
+            container_client.download_blob(manifest_blob_name(blob_name)).readall()
+        )
+        properties = blob_client.get_blob_properties()
+        # Get Block List is refused on archived blobs; their block list was
+        # checked by upload_to_azure before they were archived.
+        committed = None
+        if properties.blob_tier != StandardBlobTier.ARCHIVE:
+            committed, _uncommitted = blob_client.get_block_list("committed")
+    except Exception as e:
+        logger.error(f"Verify failed for {blob_name}: {e}")
+        raise RuntimeError(f"Verify failed for {blob_name}: {e}") from e
+
+    problems = []
+    if properties.size != manifest["size"]:
+        problems.append(f"size {properties.size} != manifest {manifest['size']}")
+    if properties.metadata.get("sha256") != manifest["sha256"]:
+        problems.append(
+            f"sha256 metadata {properties.metadata.get('sha256')} != manifest {manifest['sha256']}"
+        )
+    if committed is not None:
+        problem = _block_list_problem(committed, manifest["blocks"])
+        if problem:
+            problems.append(problem)
+
+    report = {
+        "blob": blob_name,
+        "size": properties.size,
+        "sha256": manifest["sha256"],
+        "blocks": len(manifest["blocks"]),
+        "block_list_checked": committed is not None,
+        "tier": properties.blob_tier,
+        "restored": False,
+    }
+    return blob_client, properties, manifest, report, problems
+
+
+def verify_backup(
+    blob_name: str,
+    connection_string: str,
+    container_name: str = "backups",
+    restore_url: Optional[str] = None,
+) -> dict:
+    """Verify an uploaded backup against its manifest.
+
+    Checks the blob size and SHA-256 metadata without reading any data, so
+    it also works on archived blobs. Blobs in other tiers also have their
+    committed block list (ids and sizes of the blocks Azure validated on
+    upload) checked; Azure refuses that on archived blobs, so upload checks
+    it before archiving. A blob that belongs to a backup set fails unless
+    the set manifest is marked complete. With `restore_url` the backup is
+    streamed into that scratch database with psql, hashing the stream on the
+    way through.
+
+    Args:
+        blob_name: Name of the backup blob
+        connection_string: Azure Storage connection string
+        container_name: Name of the blob container
+        restore_url: Connection URI of an empty scratch database to restore into
+
+    Returns:
+        Verification report
+
+    Raises:
+        RuntimeError: If any check fails
+    """
+    info_logger.info(f"Verify started: {blob_name}")
+    start_time = time.time()
+    container_client = ContainerClient.from_connection_string(
+        connection_string,
+        container_name=container_name
+    )
+    blob_client, properties, manifest, report, problems = _check_blob(
+        container_client, blob_name
+    )
+
+    set_name = properties.metadata.get("backup_set")
+    if set_name:
+        try:
+            backup_set = _load_set_manifest(container_client, set_name)
+        except RuntimeError as e:
+            problems.append(str(e))
+        else:
+            if blob_name not in backup_set["blobs"]:
+                problems.append(f"not listed in set manifest {set_name}")
+            elif restore_url and len(backup_set["blobs"]) > 1:
+                problems.append(
+                    f"one of {len(backup_set['blobs'])} blobs of a backup set; "
+                    f"verify {set_name} to restore the whole set"
+                )
+
+    if not problems and restore_url:
+        report.update(restore_sample(blob_client, properties, manifest, restore_url))
+
+    if problems:
+        error_msg = f"Verify failed for {blob_name}: {'; '.join(problems)}"
+        logger.error(error_msg)
+        raise RuntimeError(error_msg)
+
+    elapsed_time = time.time() - start_time
+    info_logger.info(f"Verify completed: {blob_name} ({elapsed_time:.2f}s, {report})")
+    return report
+
+
+def verify_backup_set(
+    set_name: str,
+    connection_string: str,
+    container_name: str = "backups",
+    restore_url: Optional[str] = None,
+) -> dict:
+    """Verify every blob of a backup set, optionally restoring them in order.
+
+    The set manifest must be marked complete. Each blob is checked like
+    verify_backup; with `restore_url` all blobs are then streamed into the
+    scratch database in the order listed, so constraints and indexes from
+    the post-data dump are created after all table data is loaded.
+
+    Args:
+        set_name: Name of the set manifest blob
+        connection_string: Azure Storage connection string
+        container_name: Name of the blob container
+        restore_url: Connection URI of an empty scratch database to restore into
+
+    Returns:
+        Verification report
+
+    Raises:
+        RuntimeError: If the set is incomplete or any check fails
+    """
+    info_logger.info(f"Verify started: {set_name}")
+    start_time = time.time()
+    container_client = ContainerClient.from_connection_string(
+        connection_string,
+        container_name=container_name
+    )
+    try:
+        backup_set = _load_set_manifest(container_client, set_name)
+    except RuntimeError as e:
+        logger.error(f"Verify failed for {set_name}: {e}")
+        raise RuntimeError(f"Verify failed for {set_name}: {e}") from e
+
+    checked = []
+    problems = []
+    for blob_name in backup_set["blobs"]:
+        blob_client, properties, manifest, report, blob_problems = _check_blob(
+            container_client, blob_name
+        )
+        if properties.metadata.get("backup_set") != set_name:
+            blob_problems.append(f"not uploaded as part of {set_name}")
+        problems += [f"{blob_name}: {problem}" for problem in blob_problems]
+        checked.append((blob_client, properties, manifest, report))
+
+    if problems:
+        error_msg = f"Verify failed for {set_name}: {'; '.join(problems)}"
+        logger.error(error_msg)
+        raise RuntimeError(error_msg)
+
+    report = {
+        "backup_set": set_name,
+        "blobs": [blob_report for *_, blob_report in checked],
+        "size": sum(blob_report["size"] for *_, blob_report in checked),
+        "restored": False,
+    }
+    if restore_url:
+        restore_seconds = 0.0
+        for blob_client, properties, manifest, _blob_report in checked:
+            restored = restore_sample(blob_client, properties, manifest, restore_url)
+            restore_seconds += restored["restore_seconds"]
+        report.update(restored, restore_seconds=round(restore_seconds, 2))
+
+    elapsed_time = time.time() - start_time
+    info_logger.info(f"Verify completed: {set_name} ({elapsed_time:.2f}s, {report})")
+    return report
+
+
+def restore_sample(blob_client: BlobClient, properties, manifest: dict, restore_url: str) -> dict:
+    """Stream a backup blob into a scratch database, checking its SHA-256.
+
+    Args:
+        blob_client: Client of the backup blob
+        properties: Blob properties from get_blob_properties
+        manifest: Parsed backup manifest
+        restore_url: Connection URI of an empty scratch database
+
+    Returns:
+        Restore details for the verification report
+
+    Raises:
+        RuntimeError: If the blob is archived, psql fails or the checksum differs
+    """
+    if properties.blob_tier == StandardBlobTier.ARCHIVE:
+        raise RuntimeError(
+            f"{properties.name} is in the Archive tier; rehydrate it to Cool or Hot "
+            f"before a sample restore"
+        )
+
+    start_time = time.time()
+    sha256 = hashlib.sha256()
+    cmd = ['psql', restore_url, '-v', 'ON_ERROR_STOP=1', '-q', '-f', '-']
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr
+            )
+        except FileNotFoundError:
+            raise RuntimeError("psql command not found") from None
+        try:
+            for chunk in blob_client.download_blob().chunks():
+                sha256.update(chunk)
+                proc.stdin.write(chunk)
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = proc.wait()
+        if returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(
+                f"Sample restore failed: {stderr.read().decode(errors='replace')}"
+            )
+
+    digest = sha256.hexdigest()
+    if digest != manifest["sha256"]:
+        raise RuntimeError(
+            f"Restored data sha256={digest} does not match manifest {manifest['sha256']}"
+        )
+
+    try:
+        tables = subprocess.run(
+            [
+                'psql', restore_url, '-tAc',
+                "SELECT count(*) FROM information_schema.tables "
+                "WHERE table_schema NOT IN ('pg_catalog', 'information_schema')",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Counting restored tables failed: {e.stderr}") from e
+
+    return {
+        "restored": True,
+        "restored_tables": int(tables or 0),
+        "restore_seconds": round(time.time() - start_time, 2),
+    }
+
+
 def cleanup_local_backup(backup_path: Path) -> None:
-    """Delete the local backup file.
+    """Delete the local backup file and its checksum file.
     
     Args:
         backup_path: Path to the backup file
     """
     try:
-        if backup_path.exists():
-            backup_path.unlink()
+        for path in (backup_path, checksum_path(backup_path)):
+            if path.exists():
+                path.unlink()
     except Exception as e:
         logger.warning(f"Failed to delete local backup: {e}")
 
 
+def _table_label(table: str) -> str:
+    """Return a filename-safe label for a deferred table's data dump."""
+    return "_data_" + re.sub(r'[^A-Za-z0-9_.-]', '_', table)
+
+
+def create_backup_set(config: dict, options: ImpactOptions) -> list[Path]:
+    """Dump the database, splitting out deferred tables' data into separate dumps.
+
+    Excluded and deferred tables keep their schema in the main dump. With
+    deferred tables the main dump only holds the pre-data and data sections;
+    each deferred table's data and the post-data section (indexes, foreign
+    keys, triggers) get dumps of their own. They are taken by parallel workers
+    that share an exported snapshot, so all files are consistent with each
+    other, and restoring them in the returned order loads every table before
+    constraints referencing them are created.
+
+    Returns:
+        Paths of the created dumps in restore order
+    """
+    connection = dict(
+        database_host=options.replica_host or config['DATABASE_HOST'],
+        database_port=options.replica_port or config['DATABASE_PORT'],
+        database_name=config['DATABASE_NAME'],
+        database_username=config['DATABASE_USERNAME'],
+        database_password=config['DATABASE_PASSWORD'],
+    )
+    if options.replica_host:
+        info_logger.info(f"Dumping from replica {connection['database_host']}")
+
+    throttle = Throttle(options.dump_max_bytes_per_second)
+    common = dict(
+        connection,
+        timestamp=datetime.utcnow().strftime("%Y%m%d_%H%M%S"),
+        options=options,
+        throttle=throttle,
+    )
+    main_args = [
+        f'--exclude-table-data={table}'
+        for table in options.exclude_tables + options.defer_tables
+    ]
+    if not options.defer_tables:
+        return [create_backup(**common, extra_args=main_args)]
+
+    jobs = (
+        [([*main_args, '--section=pre-data', '--section=data'], "")]
+        + [
+            (['--data-only', '-t', table], _table_label(table))
+            for table in options.defer_tables
+        ]
+        + [(['--section=post-data'], "_post_data")]
+    )
+    with exported_snapshot(**connection) as snapshot:
+        with ThreadPoolExecutor(max_workers=options.parallel_workers) as pool:
+            futures = [
+                pool.submit(
+                    create_backup, **common, extra_args=args, label=label, snapshot=snapshot
+                )
+                for args, label in jobs
+            ]
+
+    failed = [future.exception() for future in futures if future.exception()]
+    if failed:
+        # Don't leave a partial set behind
+        for future in futures:
+            if not future.exception():
+                cleanup_local_backup(future.result())
+        raise failed[0]
+    return [future.result() for future in futures]
+
+
 def run_backup_job() -> None:
     """Execute the complete backup workflow."""
     job_start = time.time()
@@ -226,27 +929,34 @@ def run_backup_job() -> None:
     try:
         # Load configuration
         config = load_environment()
+        options = ImpactOptions.from_env()
         
         # Create backup
-        backup_path = create_backup(
-            database_host=config['DATABASE_HOST'],
-            database_port=config['DATABASE_PORT'],
-            database_name=config['DATABASE_NAME'],
-            database_username=config['DATABASE_USERNAME'],
-            database_password=config['DATABASE_PASSWORD'],
-        )
-        
-        # Upload to Azure
-        blob_name = upload_to_azure(
-            backup_path=backup_path,
-            connection_string=config['AZURE_STORAGE_CONNECTION_STRING'],
-        )
+        backup_paths = create_backup_set(config, options)
         
-        # Cleanup local backup
-        cleanup_local_backup(backup_path)
+        # Upload to Azure; the set manifest is only marked complete at the end
+        connection_string = config['AZURE_STORAGE_CONNECTION_STRING']
+        blob_names = [backup_path.name for backup_path in backup_paths]
+        set_name = set_manifest_name(blob_names[0])
+        upload_set_manifest(set_name, blob_names, connection_string)
+        for backup_path in backup_paths:
+            upload_to_azure(
+                backup_path=backup_path,
+                connection_string=connection_string,
+                block_size=int(float(os.getenv('BACKUP_BLOCK_SIZE_MB', '8')) * 1024 * 1024),
+                blob_tier=StandardBlobTier(os.getenv('BACKUP_BLOB_TIER', 'Archive')),
+                max_bytes_per_second=options.upload_max_bytes_per_second,
+                backup_set=set_name,
+            )
+            # Cleanup local backup
+            cleanup_local_backup(backup_path)
+        upload_set_manifest(set_name, blob_names, connection_string, complete=True)
         
         total_time = time.time() - job_start
-        info_logger.info(f"Backup job completed successfully (total: {total_time:.2f}s)")
+        info_logger.info(
+            f"Backup job completed successfully (total: {total_time:.2f}s, "
+            f"set: {set_name}, blobs: {', '.join(blob_names)})"
+        )
         
     except Exception as e:
         total_time = time.time() - job_start
@@ -254,5 +964,44 @@ def run_backup_job() -> None:
         raise
 
 
+def run_verify_job(blob_name: str, restore: bool = False) -> dict:
+    """Verify an uploaded backup blob or set, optionally restoring it into SCRATCH_DATABASE_URL."""
+    load_dotenv()
+    connection_string = os.getenv('AZURE_STORAGE_CONNECTION_STRING')
+    if not connection_string:
+        raise ValueError("Missing required environment variables: AZURE_STORAGE_CONNECTION_STRING")
+    restore_url = None
+    if restore:
+        restore_url = os.getenv('SCRATCH_DATABASE_URL')
+        if not restore_url:
+            raise ValueError("--restore requires SCRATCH_DATABASE_URL")
+    if blob_name.endswith(SET_MANIFEST_SUFFIX):
+        return verify_backup_set(blob_name, connection_string, restore_url=restore_url)
+    return verify_backup(blob_name, connection_string, restore_url=restore_url)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Command line entry point; runs a backup when no command is given."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("backup", help="dump the database and upload it (default)")
+    verify = commands.add_parser("verify", help="verify an uploaded backup")
+    verify.add_argument(
+        "blob_name", help=f"name of the backup blob or `*{SET_MANIFEST_SUFFIX}` set manifest"
+    )
+    verify.add_argument(
+        "--restore",
+        action="store_true",
+        help="also restore it (every blob of a set, in order) into the empty database "
+        "at SCRATCH_DATABASE_URL",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "verify":
+        run_verify_job(args.blob_name, restore=args.restore)
+    else:
+        run_backup_job()
+
+
 if __name__ == "__main__":
-    run_backup_job()
+    main()
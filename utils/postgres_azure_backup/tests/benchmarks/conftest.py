@@ -0,0 +1,127 @@
+"""Fixtures for the offline backup benchmarks.
+
+    BENCH_BACKUP_MB=512 BENCH_LATENCY_MS=5 pytest -m benchmark
+
+Results are written to a JSON report (BENCHMARK_REPORT, default
+.benchmarks/report.json under the pytest rootdir) in the same format as the
+scraper benchmarks.
+"""
+
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Any
+
+import pytest
+
+from stubs import AzureBlobStub, install_fake_pg_dump, install_fake_psql, stub_environment
+
+BENCH_BACKUP_BYTES = int(float(os.getenv("BENCH_BACKUP_MB", "32")) * 1024 * 1024)
+BENCH_LATENCY_SECONDS = float(os.getenv("BENCH_LATENCY_MS", "0")) / 1000
+BENCH_ERROR_RATE = float(os.getenv("BENCH_ERROR_RATE", "0"))
+BENCHMARK_REPORT = os.getenv("BENCHMARK_REPORT")
+
+
+def _latency_summary(seconds: list[float]) -> dict[str, float]:
+    """Summarise Azure request latencies in milliseconds."""
+    if len(seconds) < 2:
+        return {"count": len(seconds)}
+    cuts = statistics.quantiles([s * 1000 for s in seconds], n=100, method="inclusive")
+    return {
+        "count": len(seconds),
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "max_ms": round(max(seconds) * 1000, 3),
+    }
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(pytestconfig) -> Iterator[list[dict[str, Any]]]:
+    """Collect results for the session and write them out at the end."""
+    results: list[dict[str, Any]] = []
+    yield results
+    if not results:
+        return
+    path = Path(BENCHMARK_REPORT or pytestconfig.rootpath / ".benchmarks/report.json")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "parameters": {
+            "backup_bytes": BENCH_BACKUP_BYTES,
+            "latency_ms": BENCH_LATENCY_SECONDS * 1000,
+            "error_rate": BENCH_ERROR_RATE,
+        },
+        "results": results,
+    }
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+@pytest.fixture
+def azure_stub() -> Iterator[AzureBlobStub]:
+    stub = AzureBlobStub(BENCH_LATENCY_SECONDS, BENCH_ERROR_RATE).start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def backup_env(azure_stub, tmp_path, monkeypatch) -> dict[str, str]:
+    """Point backup_service at the Azure stub and fake pg_dump/psql on PATH."""
+    bin_dir = tmp_path / "bin"
+    install_fake_pg_dump(bin_dir)
+    install_fake_psql(bin_dir)
+    env = stub_environment(azure_stub.connection_string, bin_dir)
+    env["STUB_PG_DUMP_BYTES"] = str(BENCH_BACKUP_BYTES)
+    env["STUB_PG_DUMP_DELAY"] = str(BENCH_LATENCY_SECONDS)
+    env["STUB_PSQL_LOG"] = str(tmp_path / "psql.log")
+    env["SCRATCH_DATABASE_URL"] = "postgresql://bench@127.0.0.1/scratch"
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+    return env
+
+
+@pytest.fixture
+def run_benchmark(azure_stub, benchmark_results) -> Callable[..., Any]:
+    """Run fn once, measuring wall time, upload latencies and peak memory."""
+
+    def run(name: str, fn: Callable[[], Any], **details: Any) -> Any:
+        first_request = len(azure_stub.latencies)
+        bytes_before = azure_stub.bytes_received
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = fn()
+        finally:
+            elapsed = time.perf_counter() - start
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        uploaded = azure_stub.bytes_received - bytes_before
+        benchmark_results.append(
+            {
+                "name": name,
+                "duration_seconds": round(elapsed, 4),
+                "bytes": BENCH_BACKUP_BYTES,
+                "throughput_mb_per_second": round(
+                    BENCH_BACKUP_BYTES / (1024 * 1024) / elapsed, 2
+                ),
+                "uploaded_bytes": uploaded,
+                "peak_memory_bytes": peak,
+                "spans": {
+                    "azure.request": _latency_summary(
+                        azure_stub.latencies[first_request:]
+                    ),
+                },
+                **details,
+            }
+        )
+        return result
+
+    return run
@@ -0,0 +1,323 @@
+"""Local stand-ins for pg_dump, psql and the Azure Blob Storage REST API."""
+
+import base64
+from email.utils import formatdate
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+from pathlib import Path
+import random
+import re
+import stat
+import sys
+from threading import Lock, Thread
+import time
+from urllib.parse import parse_qs, urlparse
+import uuid
+
+ACCOUNT_NAME = "devstoreaccount1"
+# Well-known Azurite development key; the stub never checks signatures.
+ACCOUNT_KEY = (
+    "Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/"
+    "K1SZFPTOtr/KBHBeksoGMGw=="
+)
+
+PG_DUMP_SCRIPT = """#!{python}
+import json, os, sys, time
+if os.environ.get("STUB_PG_DUMP_LOG"):
+    with open(os.environ["STUB_PG_DUMP_LOG"], "a") as log:
+        log.write(json.dumps({{"args": sys.argv[1:], "nice": os.nice(0)}}) + "\\n")
+size = int(os.environ["STUB_PG_DUMP_BYTES"])
+delay = float(os.environ.get("STUB_PG_DUMP_DELAY", "0"))
+line = b"INSERT INTO reviews VALUES (1, 'stub', 'Lorem ipsum dolor sit amet');\\n"
+out = sys.stdout.buffer
+out.write(("-- pg_dump " + " ".join(sys.argv[1:]) + "\\n").encode())
+written = 0
+while written < size:
+    chunk = line * 1024
+    out.write(chunk)
+    written += len(chunk)
+    if delay:
+        time.sleep(delay)
+"""
+
+
+def install_fake_pg_dump(bin_dir: Path) -> Path:
+    """Write an executable pg_dump that emits STUB_PG_DUMP_BYTES of SQL.
+
+    The first line is a comment with the pg_dump arguments. With
+    STUB_PG_DUMP_LOG set, each call appends its arguments and niceness to
+    that file as one JSON line.
+    """
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    script = bin_dir / "pg_dump"
+    script.write_text(PG_DUMP_SCRIPT.format(python=sys.executable), encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return script
+
+
+class AzureBlobStub:
+    """Accepts container, blob, block, block list and tier requests.
+
+    Block checksums (x-ms-content-crc64 or Content-MD5) are validated like the
+    real service does. Committed blobs keep their block list, metadata and
+    tier; archived blobs refuse Get Blob and Get Block List like Azure does.
+    Contents are only kept for small blobs (such as manifests) unless
+    `keep_data` is set, so large uploads stay cheap. Every request's
+    server-side handling time is recorded in `latencies`.
+    """
+
+    SMALL_BLOB_BYTES = 1024 * 1024
+
+    def __init__(
+        self, latency_seconds: float = 0.0, error_rate: float = 0.0, keep_data: bool = False
+    ):
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self.keep_data = keep_data
+        self.requests = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.latencies: list[float] = []
+        self.blobs: dict[str, int] = {}
+        self.properties: dict[str, dict] = {}
+        self.data: dict[str, bytes] = {}
+        self._staged: dict[str, dict[str, tuple[int, bytes | None]]] = {}
+        self._lock = Lock()
+        self._random = random.Random(1234)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, method: str) -> None:
+                start = time.perf_counter()
+                length = int(self.headers.get("Content-Length") or 0)
+                body = b""
+                while len(body) < length:
+                    body += self.rfile.read(min(length - len(body), 1 << 20))
+                status, headers, payload = stub.handle(
+                    method, urlparse(self.path), self.headers, body
+                )
+                self.send_response(status)
+                self.send_header("ETag", f'"0x{uuid.uuid4().hex[:16].upper()}"')
+                self.send_header("Last-Modified", formatdate(usegmt=True))
+                self.send_header("x-ms-request-id", str(uuid.uuid4()))
+                self.send_header("x-ms-version", "2021-12-02")
+                self.send_header("x-ms-request-server-encrypted", "true")
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if "Content-Length" not in headers:
+                    self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if method != "HEAD":
+                    self.wfile.write(payload)
+                with stub._lock:
+                    stub.latencies.append(time.perf_counter() - start)
+
+            def do_PUT(self):
+                self._respond("PUT")
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_HEAD(self):
+                self._respond("HEAD")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def connection_string(self) -> str:
+        host, port = self._server.server_address[:2]
+        return (
+            "DefaultEndpointsProtocol=http;"
+            f"AccountName={ACCOUNT_NAME};AccountKey={ACCOUNT_KEY};"
+            f"BlobEndpoint=http://{host}:{port}/{ACCOUNT_NAME};"
+        )
+
+    def start(self) -> "AzureBlobStub":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, method: str, url, headers, body: bytes) -> tuple[int, dict, bytes]:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        blob = url.path.rsplit("/", 1)[-1]
+        with self._lock:
+            self.requests += 1
+            self.bytes_received += len(body)
+            if self._random.random() < self.error_rate:
+                self.errors += 1
+                return 503, {}, b""
+            if params.get("restype") == "container":
+                return 201, {}, b""
+            if method == "PUT":
+                return self._put(blob, params, headers, body)
+            return self._get(method, blob, params, headers)
+
+    def _put(self, blob: str, params: dict, headers, body: bytes) -> tuple[int, dict, bytes]:
+        comp = params.get("comp")
+        if comp == "tier":
+            self.properties[blob]["tier"] = headers.get("x-ms-access-tier")
+            return 200, {}, b""
+        if comp == "block":
+            error = _checksum_error(headers, body)
+            if error:
+                return 400, {"x-ms-error-code": error}, b""
+            keep = body if self.keep_data else None
+            self._staged.setdefault(blob, {})[params["blockid"]] = (len(body), keep)
+            echo = {
+                name: headers[name]
+                for name in ("x-ms-content-crc64", "Content-MD5")
+                if headers.get(name)
+            }
+            return 201, echo, b""
+        if comp == "blocklist":
+            staged = self._staged.pop(blob, {})
+            ids = re.findall(r"<(?:Latest|Uncommitted)>([^<]+)<", body.decode())
+            blocks = [(block_id, staged[block_id]) for block_id in ids]
+            data = None
+            if self.keep_data:
+                data = b"".join(block for _block_id, (_size, block) in blocks)
+            self._commit(blob, headers, [(i, size) for i, (size, _) in blocks], data)
+            return 201, {}, b""
+        if comp is None:
+            keep = self.keep_data or len(body) <= self.SMALL_BLOB_BYTES
+            self._commit(blob, headers, [], body if keep else None, size=len(body))
+            return 201, {}, b""
+        return 400, {}, b""
+
+    def _commit(
+        self, blob: str, headers, blocks: list, data: bytes | None, size: int | None = None
+    ) -> None:
+        self.blobs[blob] = size if size is not None else sum(size for _id, size in blocks)
+        self.properties[blob] = {
+            "blocks": blocks,
+            "tier": headers.get("x-ms-access-tier") or "Hot",
+            "metadata": {
+                name[len("x-ms-meta-"):]: value
+                for name, value in headers.items()
+                if name.lower().startswith("x-ms-meta-")
+            },
+            "content_type": headers.get("x-ms-blob-content-type") or "application/octet-stream",
+        }
+        if data is not None:
+            self.data[blob] = data
+        else:
+            self.data.pop(blob, None)
+
+    def _get(self, method: str, blob: str, params: dict, headers) -> tuple[int, dict, bytes]:
+        if blob not in self.blobs:
+            return 404, {"x-ms-error-code": "BlobNotFound"}, b""
+        properties = self.properties[blob]
+        if params.get("comp") == "blocklist" and properties["tier"] == "Archive":
+            # Azure only allows property, metadata, tier and delete
+            # operations on archived blobs.
+            return 409, {"x-ms-error-code": "BlobArchived"}, b""
+        if params.get("comp") == "blocklist":
+            committed = "".join(
+                f"<Block><Name>{block_id}</Name><Size>{size}</Size></Block>"
+                for block_id, size in properties["blocks"]
+            )
+            xml = (
+                '<?xml version="1.0" encoding="utf-8"?><BlockList>'
+                f"<CommittedBlocks>{committed}</CommittedBlocks>"
+                "<UncommittedBlocks /></BlockList>"
+            )
+            return 200, {"Content-Type": "application/xml"}, xml.encode()
+
+        size = self.blobs[blob]
+        common = {
+            "x-ms-blob-type": "BlockBlob",
+            "x-ms-access-tier": properties["tier"],
+            "Content-Type": properties["content_type"],
+            **{f"x-ms-meta-{name}": value for name, value in properties["metadata"].items()},
+        }
+        if method == "HEAD":
+            return 200, {**common, "Content-Length": str(size)}, b""
+        if properties["tier"] == "Archive":
+            return 409, {"x-ms-error-code": "BlobArchived"}, b""
+        data = self.data.get(blob)
+        if data is None:
+            return 500, {"x-ms-error-code": "StubDataNotKept"}, b""
+        first, last = 0, size - 1
+        requested = headers.get("x-ms-range") or headers.get("Range")
+        if requested:
+            first_text, _, last_text = requested.split("=", 1)[1].partition("-")
+            first = int(first_text)
+            last = min(int(last_text), size - 1) if last_text else size - 1
+        payload = data[first : last + 1]
+        return (
+            206 if requested else 200,
+            {**common, "Content-Range": f"bytes {first}-{last}/{size}"},
+            payload,
+        )
+
+
+def _checksum_error(headers, body: bytes) -> str | None:
+    """Validate a block the way Azure does, returning the error code if any."""
+    crc64 = headers.get("x-ms-content-crc64")
+    if crc64:
+        from azure.storage.extensions import checksums
+
+        computed = checksums.crc64.compute(body, 0).to_bytes(8, "little")
+        if base64.b64encode(computed).decode() != crc64:
+            return "Crc64Mismatch"
+    md5 = headers.get("Content-MD5")
+    if md5 and base64.b64encode(hashlib.md5(body).digest()).decode() != md5:
+        return "Md5Mismatch"
+    return None
+
+
+PSQL_SCRIPT = """#!{python}
+import json, os, sys
+log = os.environ["STUB_PSQL_LOG"]
+if "-tAc" in sys.argv:
+    if os.environ.get("STUB_PSQL_QUERY_ERROR"):
+        sys.stderr.write(os.environ["STUB_PSQL_QUERY_ERROR"])
+        sys.exit(2)
+    print(os.environ.get("STUB_PSQL_TABLES", "3"))
+    sys.exit(0)
+header = sys.stdin.buffer.readline()
+received = len(header)
+for chunk in iter(lambda: sys.stdin.buffer.read(1 << 20), b""):
+    received += len(chunk)
+with open(log, "a") as f:
+    f.write(json.dumps({{"received": received, "header": header.decode().strip()}}) + "\\n")
+"""
+
+
+def install_fake_psql(bin_dir: Path) -> Path:
+    """Write an executable psql that swallows stdin and logs the byte count.
+
+    Each restore appends the number of bytes read and the first line (the
+    fake pg_dump's header) to STUB_PSQL_LOG as one JSON line. `-tAc`
+    queries print STUB_PSQL_TABLES, or fail with STUB_PSQL_QUERY_ERROR.
+    """
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    script = bin_dir / "psql"
+    script.write_text(PSQL_SCRIPT.format(python=sys.executable), encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return script
+
+
+def stub_environment(connection_string: str, bin_dir: Path) -> dict[str, str]:
+    """Return environment variables pointing backup_service at the stubs."""
+    return {
+        "DATABASE_HOST": "127.0.0.1",
+        "DATABASE_PORT": "5432",
+        "DATABASE_NAME": "bench",
+        "DATABASE_USERNAME": "bench",
+        "DATABASE_PASSWORD": "bench",
+        "AZURE_STORAGE_CONNECTION_STRING": connection_string,
+        "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+    }
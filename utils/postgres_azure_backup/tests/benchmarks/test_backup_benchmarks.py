@@ -0,0 +1,282 @@
+"""Backup pipeline benchmarks against a fake pg_dump and an Azure Blob stub."""
+
+from contextlib import contextmanager
+import hashlib
+import json
+import time
+
+from azure.core.exceptions import HttpResponseError
+from azure.storage.blob import BlobClient, StandardBlobTier
+import pytest
+
+import backup_service
+
+pytestmark = pytest.mark.benchmark
+
+
+def _psql_log(tmp_path):
+    return [
+        json.loads(line) for line in (tmp_path / "psql.log").read_text().splitlines()
+    ]
+
+
+def _create_backup(backup_env, backup_dir):
+    return backup_service.create_backup(
+        database_host=backup_env["DATABASE_HOST"],
+        database_port=backup_env["DATABASE_PORT"],
+        database_name=backup_env["DATABASE_NAME"],
+        database_username=backup_env["DATABASE_USERNAME"],
+        database_password=backup_env["DATABASE_PASSWORD"],
+        backup_dir=str(backup_dir),
+    )
+
+
+def test_create_backup(backup_env, tmp_path, run_benchmark):
+    backup_path = run_benchmark(
+        "backup_create", lambda: _create_backup(backup_env, tmp_path)
+    )
+
+    assert backup_path.stat().st_size >= int(backup_env["STUB_PG_DUMP_BYTES"])
+    assert backup_service.read_checksum(backup_path) == hashlib.sha256(
+        backup_path.read_bytes()
+    ).hexdigest()
+
+
+def test_upload_to_azure(backup_env, azure_stub, tmp_path, run_benchmark):
+    backup_path = tmp_path / "backup_bench.sql"
+    with open(backup_path, "wb") as f:
+        f.truncate(int(backup_env["STUB_PG_DUMP_BYTES"]))
+
+    blob_name = run_benchmark(
+        "backup_upload",
+        lambda: backup_service.upload_to_azure(
+            backup_path=backup_path,
+            connection_string=backup_env["AZURE_STORAGE_CONNECTION_STRING"],
+        ),
+    )
+
+    assert azure_stub.blobs[blob_name] == backup_path.stat().st_size
+    manifest = json.loads(azure_stub.data[backup_service.manifest_blob_name(blob_name)])
+    assert azure_stub.properties[blob_name]["metadata"]["sha256"] == manifest["sha256"]
+    assert azure_stub.properties[blob_name]["tier"] == "Archive"
+    assert sum(block["size"] for block in manifest["blocks"]) == manifest["size"]
+
+
+def test_upload_rejects_changed_file(backup_env, azure_stub, tmp_path):
+    backup_path = _create_backup(backup_env, tmp_path)
+    with open(backup_path, "r+b") as f:
+        f.write(b"XX")
+
+    with pytest.raises(RuntimeError, match="Checksum mismatch"):
+        backup_service.upload_to_azure(
+            backup_path=backup_path,
+            connection_string=backup_env["AZURE_STORAGE_CONNECTION_STRING"],
+        )
+    assert backup_path.name not in azure_stub.blobs
+
+
+def test_verify_backup(backup_env, azure_stub, tmp_path, run_benchmark):
+    backup_path = _create_backup(backup_env, tmp_path)
+    blob_name = backup_service.upload_to_azure(
+        backup_path=backup_path,
+        connection_string=backup_env["AZURE_STORAGE_CONNECTION_STRING"],
+    )
+    uploaded = azure_stub.bytes_received
+
+    report = run_benchmark(
+        "backup_verify",
+        lambda: backup_service.run_verify_job(blob_name),
+    )
+
+    assert report["sha256"] == backup_service.read_checksum(backup_path)
+    assert report["tier"] == "Archive"
+    # Azure refuses Get Block List on archived blobs; upload checked it.
+    assert not report["block_list_checked"]
+    # Metadata-only: verification reads no backup data.
+    assert azure_stub.bytes_received == uploaded
+
+
+def test_upload_checks_block_list_before_archiving(backup_env, azure_stub, tmp_path):
+    backup_path = _create_backup(backup_env, tmp_path)
+    blob_name = backup_service.upload_to_azure(
+        backup_path=backup_path,
+        connection_string=backup_env["AZURE_STORAGE_CONNECTION_STRING"],
+        block_size=4 * 1024 * 1024,
+    )
+
+    blob_client = BlobClient.from_connection_string(
+        backup_env["AZURE_STORAGE_CONNECTION_STRING"], "backups", blob_name
+    )
+    assert blob_client.get_blob_properties().blob_tier == "Archive"
+    with pytest.raises(HttpResponseError) as excinfo:
+        blob_client.get_block_list("committed")
+    assert excinfo.value.error_code == "BlobArchived"
+    manifest = json.loads(azure_stub.data[backup_service.manifest_blob_name(blob_name)])
+    assert len(manifest["blocks"]) == len(azure_stub.properties[blob_name]["blocks"])
+    assert all(block["crc64"] for block in manifest["blocks"])
+
+
+def test_verify_backup_with_restore(backup_env, azure_stub, tmp_path, run_benchmark):
+    azure_stub.keep_data = True
+    backup_path = _create_backup(backup_env, tmp_path)
+    blob_name = backup_service.upload_to_azure(
+        backup_path=backup_path,
+        connection_string=backup_env["AZURE_STORAGE_CONNECTION_STRING"],
+        blob_tier=StandardBlobTier.COOL,
+    )
+
+    report = run_benchmark(
+        "backup_verify_restore",
+        lambda: backup_service.run_verify_job(blob_name, restore=True),
+    )
+
+    assert report["restored"]
+    restored = _psql_log(tmp_path)
+    assert [entry["received"] for entry in restored] == [backup_path.stat().st_size]
+
+
+def test_verify_restore_reports_failed_table_count(
+    backup_env, azure_stub, tmp_path, monkeypatch
+):
+    azure_stub.keep_data = True
+    backup_path = _create_backup(backup_env, tmp_path)
+    blob_name = backup_service.upload_to_azure(
+        backup_path=backup_path,
+        connection_string=backup_env["AZURE_STORAGE_CONNECTION_STRING"],
+        blob_tier=StandardBlobTier.COOL,
+    )
+    monkeypatch.setenv("STUB_PSQL_QUERY_ERROR", "connection refused")
+
+    with pytest.raises(RuntimeError, match="Counting restored tables failed"):
+        backup_service.run_verify_job(blob_name, restore=True)
+
+
+def test_run_backup_job(backup_env, azure_stub, run_benchmark):
+    run_benchmark("backup_job", backup_service.run_backup_job)
+
+    # The backup blob, its manifest and the set manifest
+    assert len(azure_stub.blobs) == 3
+    (set_name,) = [name for name in azure_stub.blobs if name.endswith(".set.json")]
+    report = backup_service.run_verify_job(set_name)
+    assert len(report["blobs"]) == 1
+
+
+def test_run_backup_job_low_impact(
+    backup_env, azure_stub, tmp_path, monkeypatch, run_benchmark
+):
+    snapshots = []
+
+    @contextmanager
+    def exported_snapshot(**connection):
+        snapshots.append(connection["database_host"])
+        yield "00000003-0000001B-1"
+
+    dump_bytes = 2 * 1024 * 1024
+    monkeypatch.setattr(backup_service, "exported_snapshot", exported_snapshot)
+    monkeypatch.setenv("STUB_PG_DUMP_BYTES", str(dump_bytes))
+    monkeypatch.setenv("STUB_PG_DUMP_LOG", str(tmp_path / "pg_dump.log"))
+    monkeypatch.setenv("DATABASE_REPLICA_HOST", "replica.internal")
+    monkeypatch.setenv("BACKUP_EXCLUDE_TABLES", "public.logs")
+    monkeypatch.setenv("BACKUP_DEFER_TABLES", "public.reviews,public.raw_events")
+    monkeypatch.setenv("BACKUP_NICE", "5")
+    monkeypatch.setenv("BACKUP_DUMP_MAX_MBPS", "8")
+    monkeypatch.setenv("BACKUP_UPLOAD_MAX_MBPS", "8")
+    monkeypatch.setenv("BACKUP_BLOCK_SIZE_MB", "0.5")
+
+    start = time.perf_counter()
+    run_benchmark("backup_job_low_impact", backup_service.run_backup_job)
+    elapsed = time.perf_counter() - start
+
+    calls = [
+        json.loads(line) for line in (tmp_path / "pg_dump.log").read_text().splitlines()
+    ]
+    assert snapshots == ["replica.internal"]
+    assert len(calls) == 4
+    for call in calls:
+        assert call["args"][call["args"].index("-h") + 1] == "replica.internal"
+        assert "--snapshot=00000003-0000001B-1" in call["args"]
+        assert call["nice"] >= 5
+    (main,) = [call for call in calls if "--section=data" in call["args"]]
+    assert "--section=pre-data" in main["args"]
+    assert "--section=post-data" not in main["args"]
+    deferred = [call for call in calls if "--data-only" in call["args"]]
+    assert sum("--section=post-data" in call["args"] for call in calls) == 1
+    assert {arg for arg in main["args"] if arg.startswith("--exclude-table-data=")} == {
+        "--exclude-table-data=public.logs",
+        "--exclude-table-data=public.reviews",
+        "--exclude-table-data=public.raw_events",
+    }
+    assert sorted(call["args"][call["args"].index("-t") + 1] for call in deferred) == [
+        "public.raw_events",
+        "public.reviews",
+    ]
+    # Four dumps, their manifests and the set manifest
+    assert len(azure_stub.blobs) == 9
+    assert any(name.endswith("_data_public.reviews.sql") for name in azure_stub.blobs)
+    # The parallel dumps share one 8 MB/s cap (the first 1 MiB read is free),
+    # each upload waits for its blocks after the first at 8 MB/s.
+    rate = 8 * 1024 * 1024
+    assert elapsed >= (4 * dump_bytes - 1024 * 1024) / rate + 4 * (1.5 * 1024 * 1024) / rate
+
+
+@pytest.fixture
+def deferred_backup_set(backup_env, azure_stub, monkeypatch):
+    """Upload a backup set with two deferred tables to the Cool tier."""
+
+    @contextmanager
+    def exported_snapshot(**connection):
+        yield "00000003-0000001B-1"
+
+    azure_stub.keep_data = True
+    monkeypatch.setattr(backup_service, "exported_snapshot", exported_snapshot)
+    monkeypatch.setenv("BACKUP_DEFER_TABLES", "public.reviews,public.raw_events")
+    monkeypatch.setenv("BACKUP_BLOB_TIER", "Cool")
+    backup_service.run_backup_job()
+    (set_name,) = [name for name in azure_stub.blobs if name.endswith(".set.json")]
+    return set_name
+
+
+def test_verify_backup_set_restores_post_data_last(
+    deferred_backup_set, backup_env, tmp_path
+):
+    report = backup_service.run_verify_job(deferred_backup_set, restore=True)
+
+    assert report["restored"]
+    assert [blob["blob"] for blob in report["blobs"]][-1].endswith("_post_data.sql")
+    headers = [entry["header"] for entry in _psql_log(tmp_path)]
+    assert len(headers) == 4
+    assert "--section=pre-data" in headers[0] and "--section=data" in headers[0]
+    assert sorted(header.split(" -t ")[1].split()[0] for header in headers[1:3]) == [
+        "public.raw_events",
+        "public.reviews",
+    ]
+    assert all("--data-only" in header for header in headers[1:3])
+    assert "--section=post-data" in headers[3]
+
+
+def test_verify_backup_part_needs_whole_set_for_restore(
+    deferred_backup_set, backup_env, azure_stub
+):
+    backup_set = json.loads(azure_stub.data[deferred_backup_set])
+    main_blob = backup_set["blobs"][0]
+
+    assert backup_service.run_verify_job(main_blob)["blob"] == main_blob
+    with pytest.raises(RuntimeError, match="restore the whole set"):
+        backup_service.run_verify_job(main_blob, restore=True)
+
+
+def test_verify_rejects_incomplete_backup_set(
+    deferred_backup_set, backup_env, azure_stub
+):
+    backup_set = json.loads(azure_stub.data[deferred_backup_set])
+    # As left behind by a job that failed before its last upload
+    backup_service.upload_set_manifest(
+        deferred_backup_set,
+        backup_set["blobs"],
+        backup_env["AZURE_STORAGE_CONNECTION_STRING"],
+    )
+
+    with pytest.raises(RuntimeError, match="incomplete"):
+        backup_service.run_verify_job(deferred_backup_set)
+    with pytest.raises(RuntimeError, match="incomplete"):
+        backup_service.run_verify_job(backup_set["blobs"][0])